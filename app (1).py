@@ -1,137 +1,59 @@
+import os
+
 import streamlit as st
-import joblib
-from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
-from difflib import get_close_matches
+from recommender import PosterCache, get_engine, metrics
 
 # Set page config
 st.set_page_config(page_title="Sistem Rekomendasi Film", layout="wide")
 
+# Engine rekomendasi dibagi oleh semua sesi. cache_resource tidak
+# men-serialize/menyalin objek seperti cache_data, jadi setiap rerun dan
+# setiap sesi memakai artifact yang sama (artifact di-load saat pertama dipakai)
+@st.cache_resource
+def load_engine():
+    return get_engine()
+
+engine = load_engine()
+
+# Cache poster lokal (thumbnail di disk), juga dibagi oleh semua sesi
+@st.cache_resource
+def load_poster_cache():
+    return PosterCache()
+
+poster_cache = load_poster_cache()
+
+# Metrics dibagi oleh semua sesi di proses ini, jadi hanya operator yang bisa
+# menyalakannya saat deploy (RECOMMENDER_DEBUG=1), dibaca sekali per proses.
+# Tanpa itu metrics tetap nonaktif, timer tidak menambah biaya, dan ?debug=1
+# diabaikan. Dengan flag itu, ?debug=1 hanya menampilkan panel debug.
+@st.cache_resource
+def debug_enabled():
+    enabled = os.environ.get('RECOMMENDER_DEBUG') == '1'
+    if enabled:
+        metrics.enable()
+    return enabled
+
+DEBUG = debug_enabled() and st.query_params.get('debug') == '1'
+
+# Hasil dibatasi dan ditampilkan per halaman, hanya halaman yang terlihat
+# yang dirender (poster + kartu film)
+MAX_RESULTS = 90
+RESULTS_PER_PAGE = 9
+# Mode "lebih beragam": hasil dipilih ulang (MMR) dari MAX_RESULTS kandidat,
+# jadi cukup beberapa halaman yang isinya tidak saling mirip
+DIVERSE_RESULTS = 27
+DIVERSITY_LAMBDA = 0.7
+
 # Initialize session state for navigation
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
 
-# Load data HANYA SEKALI
-@st.cache_data
-def load_data():
-    df_all = joblib.load('df_all.pkl')
-    tfidf = joblib.load('tfidf_vectorizer.pkl')
-    tfidf_matrix = joblib.load('tfidf_matrix.pkl')
-    cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
-    return df_all, tfidf, tfidf_matrix, cosine_sim
-
-df_all, tfidf, tfidf_matrix, cosine_sim = load_data()
-
-# Fungsi untuk mencari film yang cocok
-def find_best_match(user_input):
-    user_input = user_input.lower().strip()
-    
-    def normalize_string(s):
-        import re
-        normalized = re.sub(r'[-_\.\,\:\;]', ' ', s.lower())
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
-        return normalized
-    
-    normalized_input = normalize_string(user_input)
-    
-    # Tolak input yang terlalu pendek
-    if len(normalized_input) < 2:
-        return None
-
-    df_temp = df_all.copy()
-    df_temp['normalized_title'] = df_temp['title'].apply(normalize_string)
-    
-    # 1. Exact match
-    exact_matches = df_temp[df_temp['normalized_title'] == normalized_input]
-    if not exact_matches.empty:
-        return exact_matches.iloc[0]['title'].lower()
-    
-    # 2. Partial match
-    partial_matches = df_temp[df_temp['normalized_title'].str.contains(normalized_input, na=False, regex=False)]
-   
-    # Tambahan validasi penting
-    input_words = normalized_input.split()
-    if len(input_words) >= 2 and partial_matches.empty:
-        return None
-    
-    if not partial_matches.empty:
-        partial_matches = partial_matches.copy()
-        partial_matches['title_length'] = partial_matches['title'].str.len()
-        partial_matches['starts_with_input'] = partial_matches['normalized_title'].str.startswith(normalized_input)
-        partial_matches['word_count'] = partial_matches['normalized_title'].str.split().str.len()
-        
-        partial_matches = partial_matches.sort_values([
-            'starts_with_input', 'word_count', 'title_length'
-        ], ascending=[False, True, True])
-        
-        return partial_matches.iloc[0]['title'].lower()
-    
-    # 3. Keyword match
-    input_words = normalized_input.split()
-    if len(input_words) > 1:
-        for word in input_words:
-            if len(word) > 2:
-                word_matches = df_temp[df_temp['normalized_title'].str.contains(word, na=False, regex=False)]
-                if not word_matches.empty:
-                    word_matches = word_matches.copy()
-                    word_matches['word_score'] = 0
-                    for input_word in input_words:
-                        word_matches['word_score'] += word_matches['normalized_title'].str.contains(input_word, na=False).astype(int)
-                    
-                    if word_matches.iloc[0]['word_score'] < 2:
-                        continue  # skip kalau cuma cocok 1 kata
-
-                    word_matches['title_length'] = word_matches['title'].str.len()
-                    word_matches = word_matches.sort_values(['word_score', 'title_length'], ascending=[False, True])
-                    
-                    return word_matches.iloc[0]['title'].lower()
-    
-    # 4. Approximate match
-    from difflib import get_close_matches
-    normalized_titles = df_temp['normalized_title'].tolist()
-    matches = get_close_matches(normalized_input, normalized_titles, n=5, cutoff=0.7)
-    
-    if matches:
-        for match in matches:
-            original_title = df_temp[df_temp['normalized_title'] == match]['title'].iloc[0]
-            return original_title.lower()
-    
-    return None
-
-# Fungsi rekomendasi film
-def recommend_film(title):
-    corrected = find_best_match(title)
-    if not corrected:
-        return None, None
-
-    # Cari index film yang dicari
-    matched_films = df_all[df_all['title'].str.lower() == corrected]
-    if matched_films.empty:
-        return None, None
-        
-    idx = matched_films.index[0]
-    original_title = matched_films.iloc[0]['title']
-    
-    # Hitung similarity scores
-    sim_scores = list(enumerate(cosine_sim[idx]))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-
-    # Filter film dengan similarity >= 0.09, exclude film yang sama persis
-    result_indices = []
-    similarities = []
-    
-    for film_idx, similarity in sim_scores:
-        if similarity >= 0.09:  # Semua film dengan similarity >= 0.09
-            result_indices.append(film_idx)
-            similarities.append(similarity)
-    
-    # Buat DataFrame hasil
-    if result_indices:
-        result = df_all.iloc[result_indices][['title', 'genres', 'overview', 'director', 'cast', 'poster_url']].copy()
-        result['cosine_similarity'] = similarities
-        return result, original_title
-    
-    return None, None
+# Hasil pencarian terakhir disimpan supaya pindah halaman tidak menghitung ulang
+if 'search_result' not in st.session_state:
+    st.session_state.search_result = None
+if 'result_page' not in st.session_state:
+    st.session_state.result_page = 0
 
 # CSS Styling
 st.markdown("""<style> 
@@ -663,6 +585,8 @@ if st.session_state.page == 'home':
 
 # ============== SEARCH PAGE ==============
 elif st.session_state.page == 'search':
+    trace = metrics.begin_trace('search_page')
+
     # Header
     st.title("🎬 Sistem Rekomendasi Film")
     
@@ -674,49 +598,137 @@ elif st.session_state.page == 'search':
     
     # Input Form
     st.subheader("Cari rekomendasi berdasarkan judul film yang kamu suka")
+    mode = st.radio("Cari berdasarkan:", ["🎬 Judul film", "📝 Deskripsi bebas"], horizontal=True)
+    by_text = mode == "📝 Deskripsi bebas"
     with st.form(key="search_form"):
-        input_title = st.text_input("Masukkan judul film:")
+        if by_text:
+            input_title = st.text_input("Deskripsikan filmnya (plot, aktor, sutradara, genre):")
+        else:
+            input_title = st.text_input("Masukkan judul film:")
+        # Filter memakai index facet engine (dipasang sebelum top-k)
+        with st.expander("🎛️ Filter (opsional)"):
+            filter_genres = st.multiselect("Genre", [genre for genre, _ in engine.facets['genres'].values()])
+            col1, col2 = st.columns(2)
+            with col1:
+                filter_director = st.text_input("Sutradara")
+            with col2:
+                filter_cast = st.text_input("Pemeran")
+        diverse = st.toggle("🎨 Hasil lebih beragam (kurangi sekuel & film yang mirip satu sama lain)")
         submit = st.form_submit_button("Cari Rekomendasi")
+
+    filters = {
+        'genres': filter_genres,
+        'director': [filter_director] if filter_director.strip() else [],
+        'cast': [filter_cast] if filter_cast.strip() else [],
+    }
+    unknown = [
+        value for name in ('director', 'cast') for value in filters[name]
+        if engine.facets[name].code(value) is None
+    ]
     
     # Hasil
     if submit and input_title.strip() == "":
         st.warning("⚠️ Masukkan judul film terlebih dahulu.")
+        st.session_state.search_result = None
+    elif submit and unknown:
+        st.warning(f"⚠️ {', '.join(unknown)} tidak ada di database.")
+        st.session_state.search_result = None
     elif submit:
-        hasil, corrected = recommend_film(input_title)
-
-        if hasil is None or hasil.empty:
-            st.warning(f"❌ Film '{input_title}' tidak ditemukan dalam database.")
+        options = {'k': MAX_RESULTS, 'filters': filters}
+        if diverse:
+            options.update(k=DIVERSE_RESULTS, mmr_lambda=DIVERSITY_LAMBDA, mmr_candidates=MAX_RESULTS)
+        if by_text:
+            hasil, terms = engine.recommend_text(input_title, **options)
+        else:
+            hasil, terms = engine.recommend_film(input_title, **options)[0], None
+        st.session_state.search_result = {'input_title': input_title, 'hasil': hasil, 'terms': terms}
+        st.session_state.result_page = 0
+
+    search_result = st.session_state.search_result
+    if search_result is not None:
+        hasil = search_result['hasil']
+
+        terms = search_result.get('terms')
+        if not hasil and terms is not None:
+            st.warning(f"❌ Tidak ada film yang cocok dengan deskripsi '{search_result['input_title']}'.")
+        elif not hasil:
+            st.warning(f"❌ Film '{search_result['input_title']}' tidak ditemukan dalam database.")
         else:
             st.markdown(f"## 🔍 Rekomendasi film untuk mu :")
             st.info(f"✅ Ditemukan {len(hasil)} film yang relevan")
-
-            for i in range(0, len(hasil), 3):
-                cols = st.columns(3)
-                for idx, col in enumerate(cols):
-                    if i + idx < len(hasil):
-                        film = hasil.iloc[i + idx]
-                        full_overview = film['overview']
-                        poster_url = film.get('poster_url', '')
-
-                        with col:
-                            if poster_url and not pd.isna(poster_url):
-                                try:
-                                    st.image(poster_url, use_container_width=True)
-                                except:
-                                    st.error("🖼️ Poster tidak dapat dimuat")
-                            else:
-                                st.markdown(f"""<div style="width:100%;height:300px;background:linear-gradient(135deg,#374151,#1f2937);border-radius:12px;display:flex;align-items:center;justify-content:center;margin-bottom:16px;border:2px dashed #6b7280;"><div style="text-align:center;color:#9ca3af;">🎬<br><small>Poster Tidak Tersedia</small></div></div>""", unsafe_allow_html=True)
-
-                            st.markdown(f"""
-                                <div class="film-card">
-                                    <h4>{film['title']}</h4>
-                                    <p><strong>Genre:</strong> {film['genres']}</p>
-                                    <p><strong>Director:</strong> {film['director']}</p>
-                                    <p><strong>Cast:</strong> {film['cast']}</p>
-                                    <p><strong>Similarity:</strong> {film['cosine_similarity']:.1%}</p>
-                                    <details style="margin-top:10px;">
-                                        <summary>📖 Sinopsis</summary>
-                                        <p style="margin-top:8px; color: #cbd5e1;">{full_overview}</p>
-                                    </details>
-                                </div>
-                            """, unsafe_allow_html=True)
+            if terms:
+                st.caption(f"Kata kunci yang dikenali: {', '.join(terms)}")
+            genre_counts = engine.facet_counts(hasil, names=('genres',), top=5)['genres']
+            st.caption("Genre terbanyak: " + ", ".join(f"{genre} ({n})" for genre, n in genre_counts))
+
+            total_pages = (len(hasil) + RESULTS_PER_PAGE - 1) // RESULTS_PER_PAGE
+            page = min(st.session_state.result_page, total_pages - 1)
+            halaman = hasil[page * RESULTS_PER_PAGE:(page + 1) * RESULTS_PER_PAGE]
+
+            # Poster halaman ini diambil paralel dari cache lokal (download kalau belum ada)
+            with metrics.timer('posters'):
+                posters = poster_cache.get_many(halaman['poster_url'])
+
+            with metrics.timer('render'):
+                for i in range(0, len(halaman), 3):
+                    cols = st.columns(3)
+                    for idx, col in enumerate(cols):
+                        if i + idx < len(halaman):
+                            film = halaman[i + idx]
+                            full_overview = film['overview']
+                            poster_url = film.get('poster_url', '')
+
+                            with col:
+                                if poster_url and not pd.isna(poster_url):
+                                    poster_path = posters.get(poster_url)
+                                    if poster_path:
+                                        st.image(poster_path, use_container_width=True)
+                                    else:
+                                        st.error("🖼️ Poster tidak dapat dimuat")
+                                else:
+                                    st.markdown(f"""<div style="width:100%;height:300px;background:linear-gradient(135deg,#374151,#1f2937);border-radius:12px;display:flex;align-items:center;justify-content:center;margin-bottom:16px;border:2px dashed #6b7280;"><div style="text-align:center;color:#9ca3af;">🎬<br><small>Poster Tidak Tersedia</small></div></div>""", unsafe_allow_html=True)
+
+                                st.markdown(f"""
+                                    <div class="film-card">
+                                        <h4>{film['title']}</h4>
+                                        <p><strong>Genre:</strong> {film['genres']}</p>
+                                        <p><strong>Director:</strong> {film['director']}</p>
+                                        <p><strong>Cast:</strong> {film['cast']}</p>
+                                        <p><strong>Similarity:</strong> {film['cosine_similarity']:.1%}</p>
+                                        <details style="margin-top:10px;">
+                                            <summary>📖 Sinopsis</summary>
+                                            <p style="margin-top:8px; color: #cbd5e1;">{full_overview}</p>
+                                        </details>
+                                    </div>
+                                """, unsafe_allow_html=True)
+
+            # Navigasi halaman
+            if total_pages > 1:
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col1:
+                    if st.button("⬅️ Sebelumnya", disabled=page == 0, use_container_width=True):
+                        st.session_state.result_page = page - 1
+                        st.rerun()
+                with col2:
+                    st.markdown(f"<p style='text-align:center;color:#94a3b8;'>Halaman {page + 1} dari {total_pages}</p>", unsafe_allow_html=True)
+                with col3:
+                    if st.button("Berikutnya ➡️", disabled=page == total_pages - 1, use_container_width=True):
+                        st.session_state.result_page = page + 1
+                        st.rerun()
+
+    trace = metrics.end_trace(trace)
+    if DEBUG and trace is not None:
+        with st.expander("🛠️ Debug: waktu per tahap"):
+            st.caption("Rerun ini")
+            st.dataframe(pd.DataFrame({
+                'tahap': list(trace['stages']) + ['total'],
+                'ms': [seconds * 1000 for seconds in trace['stages'].values()] + [trace['total'] * 1000],
+            }), hide_index=True)
+            if trace['counters']:
+                st.json(trace['counters'])
+            st.caption("Agregat sejak proses dimulai")
+            snapshot = metrics.snapshot()
+            st.dataframe(pd.DataFrame(snapshot['stages']).T.round(3))
+            st.json(snapshot['counters'])
+            st.download_button("⬇️ Ekspor (format Prometheus)", metrics.prometheus(),
+                               file_name="metrics.txt", mime="text/plain")
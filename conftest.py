@@ -0,0 +1 @@
+# Folder root repo masuk sys.path, jadi tests bisa import recommender tanpa install
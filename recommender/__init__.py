@@ -0,0 +1,41 @@
+from .ann import IVFIndex
+from .artifacts import ARTIFACT_DIR, export_mmap_artifacts, load_artifacts
+from .cache import LRUCache
+from .engine import RecommenderEngine, get_engine
+from .export import export_neighbours
+from .facets import FacetIndex, Facets
+from .films import FilmRecord, FilmTable, Recommendations, StringColumn
+from .metrics import Metrics, metrics
+from .posters import PosterCache
+from .query import QueryEncoder
+from .ranking import rank_candidates, top_k
+from .text import normalize_string
+from .title_index import TitleIndex
+from .update import idf_drift, staleness_report
+
+__all__ = [
+    'ARTIFACT_DIR',
+    'FacetIndex',
+    'Facets',
+    'FilmRecord',
+    'FilmTable',
+    'IVFIndex',
+    'LRUCache',
+    'Metrics',
+    'PosterCache',
+    'QueryEncoder',
+    'Recommendations',
+    'RecommenderEngine',
+    'StringColumn',
+    'TitleIndex',
+    'export_mmap_artifacts',
+    'export_neighbours',
+    'get_engine',
+    'idf_drift',
+    'load_artifacts',
+    'metrics',
+    'normalize_string',
+    'rank_candidates',
+    'staleness_report',
+    'top_k',
+]
@@ -0,0 +1,177 @@
+import argparse
+import json
+import logging
+import os
+
+from .ann import ANN_DIRNAME
+from .artifacts import ARTIFACT_DIR, MMAP_DIRNAME, export_mmap_artifacts
+from .bench import DEFAULT_SCALES, compare_reports, run_benchmarks
+from .build import append_artifacts, build_artifacts, verify_artifacts
+from .engine import RecommenderEngine
+from .export import EXPORT_FORMATS, export_neighbours
+from .loadtest import load_test
+from .posters import POSTER_CACHE_DIR, PosterCache
+from .server import serve
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m recommender')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='konversi artifact pickle ke format mmap')
+    export.add_argument('--source', default=ARTIFACT_DIR, help='folder berisi *.pkl')
+    export.add_argument('--out', default=os.path.join(ARTIFACT_DIR, MMAP_DIRNAME))
+
+    prefetch = commands.add_parser('prefetch-posters', help='isi cache poster untuk seluruh katalog')
+    prefetch.add_argument('--artifacts', default=ARTIFACT_DIR)
+    prefetch.add_argument('--cache-dir', default=POSTER_CACHE_DIR)
+    prefetch.add_argument('--workers', type=int, default=16)
+
+    build = commands.add_parser('build', help='bangun ulang artifact dari data mentah (csv/jsonl/pkl)')
+    build.add_argument('source')
+    build.add_argument('--out', help='default: builds/<version>')
+    build.add_argument('--version')
+    build.add_argument('--chunk-size', type=int, default=50_000)
+    build.add_argument('--jobs', type=int, help='jumlah proses (default: semua core)')
+
+    append = commands.add_parser('append', help='tambah film ke artifact yang ada tanpa refit TF-IDF')
+    append.add_argument('source')
+    append.add_argument('--artifacts', default=ARTIFACT_DIR, help='artifact dasar')
+    append.add_argument('--out', help='default: builds/<version>')
+    append.add_argument('--version')
+    append.add_argument('--chunk-size', type=int, default=50_000)
+
+    ann = commands.add_parser('ann-build', help='bangun index ANN (SVD + IVF) dan ukur recall-nya')
+    ann.add_argument('--artifacts', default=ARTIFACT_DIR)
+    ann.add_argument('--out', help='default: <folder artifact>/ann')
+    ann.add_argument('--components', type=int, default=128)
+    ann.add_argument('--lists', type=int, help='jumlah cluster (default: sqrt(jumlah film))')
+    ann.add_argument('--nprobe', type=int, default=16)
+    ann.add_argument('--k', type=int, default=10, help='k untuk recall@k')
+    ann.add_argument('--sample', type=int, default=200)
+
+    api = commands.add_parser('serve', help='jalankan API HTTP JSON')
+    api.add_argument('--artifacts', default=ARTIFACT_DIR)
+    api.add_argument('--host', default='127.0.0.1')
+    api.add_argument('--port', type=int, default=8000)
+    api.add_argument('--workers', type=int, default=1, help='jumlah proses')
+    api.add_argument('--threads', type=int, default=4, help='thread scoring per proses')
+    api.add_argument('--max-pending', type=int, default=64, help='batas antrean sebelum 503')
+    api.add_argument('--search', choices=['exact', 'ann'], default='exact')
+    api.add_argument('--preload', action=argparse.BooleanOptionalAction, default=True,
+                     help='load + warmup sekali di proses induk sebelum fork (memori dibagi antar worker)')
+    api.add_argument('--warmup', type=int, default=200, help='jumlah query warmup sebelum menerima traffic (0 = tanpa)')
+    api.add_argument('--log-traces', action='store_true', help='tulis trace tiap request sebagai log JSON')
+
+    loadtest = commands.add_parser('loadtest', help='load test API (p50/p99 latency, request/detik)')
+    loadtest.add_argument('--url', default='http://127.0.0.1:8000')
+    loadtest.add_argument('--artifacts', default=ARTIFACT_DIR, help='sumber judul untuk query')
+    loadtest.add_argument('--endpoint', choices=['recommend', 'match'], default='recommend')
+    loadtest.add_argument('--requests', type=int, default=2000)
+    loadtest.add_argument('--concurrency', type=int, default=16)
+    loadtest.add_argument('--k', type=int, default=10)
+
+    bench = commands.add_parser('bench', help='benchmark load, pencocokan judul dan rekomendasi per skala katalog')
+    bench.add_argument('--artifacts', default=ARTIFACT_DIR, help='folder berisi *.pkl (sumber resample)')
+    bench.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)), help='jumlah film, pisahkan dengan koma')
+    bench.add_argument('--queries', type=int, default=300, help='jumlah query per kategori')
+    bench.add_argument('--repeat', type=int, default=3, help='ulangan per query (diambil yang tercepat)')
+    bench.add_argument('--out', default='bench.json')
+    bench.add_argument('--compare', help='hasil benchmark sebelumnya (JSON) sebagai pembanding')
+    bench.add_argument('--tolerance', type=float, default=0.2, help='kenaikan relatif yang dianggap regresi')
+
+    neighbours = commands.add_parser('export-neighbours', help='ekspor tabel top-k film mirip untuk seluruh katalog')
+    neighbours.add_argument('out', help='folder output (part-*.csv/.parquet + _progress.json)')
+    neighbours.add_argument('--artifacts', default=ARTIFACT_DIR)
+    neighbours.add_argument('--k', type=int, default=20)
+    neighbours.add_argument('--min-similarity', type=float, default=0.0)
+    neighbours.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    neighbours.add_argument('--block-size', type=int, help='film per blok (default: otomatis dari ukuran katalog)')
+    neighbours.add_argument('--part-rows', type=int, default=50_000, help='film per file part')
+    neighbours.add_argument('--resume', action='store_true', help='lanjutkan ekspor yang terputus')
+
+    verify = commands.add_parser('verify', help='cek checksum artifact terhadap manifest')
+    verify.add_argument('path')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        manifest = export_mmap_artifacts(args.out, args.source)
+        print(f"✅ {manifest['n_rows']} film ditulis ke {args.out}")
+
+    elif args.command == 'build':
+        build_artifacts(args.source, args.out, args.version, args.chunk_size, args.jobs)
+
+    elif args.command == 'append':
+        append_artifacts(args.source, args.artifacts, args.out, args.version, args.chunk_size)
+
+    elif args.command == 'ann-build':
+        engine = RecommenderEngine(args.artifacts, search='ann')
+        index = engine.build_ann_index(n_components=args.components, n_lists=args.lists, nprobe=args.nprobe)
+        out = args.out or os.path.join(engine.load()['path'], ANN_DIRNAME)
+        index.save(out)
+        print(f"✅ Index ANN {len(index)} film, {index.n_lists} cluster ditulis ke {out}")
+        stats = engine.ann_recall(k=args.k, sample=args.sample)
+        print(f"recall@{args.k} {stats['recall']:.3f}, exact {stats['exact_ms']:.2f} ms, "
+              f"ANN {stats['ann_ms']:.2f} ms per film")
+
+    elif args.command == 'serve':
+        def engine_factory():
+            return RecommenderEngine(args.artifacts, search=args.search)
+
+        if args.log_traces:
+            logging.basicConfig(level=logging.INFO, format='%(message)s')
+        serve(engine_factory, args.host, args.port, args.workers, args.threads, args.max_pending,
+              args.log_traces, args.preload, args.warmup)
+
+    elif args.command == 'loadtest':
+        titles = RecommenderEngine(args.artifacts).films['title']
+        stats = load_test(args.url, titles, args.endpoint, args.requests, args.concurrency, args.k)
+        print(json.dumps(stats, indent=2))
+
+    elif args.command == 'bench':
+        scales = [int(n) for n in args.scales.split(',') if n]
+        report = run_benchmarks(scales, args.artifacts, args.queries, args.repeat)
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'✅ Hasil benchmark ditulis ke {args.out}')
+
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+            rows = compare_reports(baseline, report, args.tolerance)
+            for row in rows:
+                flag = '❌' if row['regression'] else '  '
+                print(f"{flag} {row['metric']:<55} {row['before']:>10} -> {row['after']:>10} ({row['change']:+.1%})")
+            regressions = [row for row in rows if row['regression']]
+            if regressions:
+                raise SystemExit(f'❌ {len(regressions)} metrik lebih lambat dari {args.compare}')
+            print(f"✅ Tidak ada regresi dibanding {baseline['meta'].get('commit') or args.compare}")
+
+    elif args.command == 'export-neighbours':
+        engine = RecommenderEngine(args.artifacts)
+        try:
+            export_neighbours(engine, args.out, args.k, args.min_similarity, args.format, args.block_size,
+                              args.part_rows, args.resume)
+        except (FileExistsError, ValueError, RuntimeError) as error:
+            raise SystemExit(f'❌ {error}') from None
+
+    elif args.command == 'verify':
+        mismatched = verify_artifacts(args.path)
+        if mismatched:
+            raise SystemExit(f"❌ Checksum tidak cocok: {', '.join(mismatched)}")
+        print('✅ Semua checksum cocok')
+
+    elif args.command == 'prefetch-posters':
+        engine = RecommenderEngine(args.artifacts)
+        cache = PosterCache(args.cache_dir, max_workers=args.workers)
+
+        def progress(done, total):
+            print(f"\r{done}/{total} poster", end='', flush=True)
+
+        ok, failed = cache.prefetch(engine.films['poster_url'], progress=progress)
+        print(f"\n✅ {ok} poster tersimpan, {failed} gagal")
+
+
+if __name__ == '__main__':
+    main()
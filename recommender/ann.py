@@ -0,0 +1,161 @@
+import json
+import os
+
+import numpy as np
+
+ANN_DIRNAME = 'ann'
+ANN_MANIFEST = 'ann.json'
+ANN_FORMAT = 1
+
+# L2-normalisasi per baris (baris nol dibiarkan nol)
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+# Cluster terdekat (cosine) untuk setiap vektor, dihitung per batch
+def _assign(vectors, centroids, batch_size=65_536):
+    assign = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch_size):
+        assign[start:start + batch_size] = np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+    return assign
+
+# Spherical k-means (Lloyd) dengan NumPy saja. Cluster kosong diisi ulang
+# dengan vektor acak supaya jumlah list tetap n_lists.
+def _kmeans(vectors, n_lists, iterations, rng):
+    from scipy.sparse import csr_matrix
+
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(vectors, centroids)
+        members = csr_matrix(
+            (np.ones(len(vectors), dtype=vectors.dtype), (assign, np.arange(len(vectors)))),
+            shape=(n_lists, len(vectors)),
+        )
+        sums = members @ vectors
+        empty = np.flatnonzero(np.bincount(assign, minlength=n_lists) == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = _normalize(sums).astype(vectors.dtype)
+    return centroids
+
+
+# Index approximate nearest neighbour gaya IVF di atas vektor TF-IDF yang
+# direduksi dengan TruncatedSVD. Vektor dikelompokkan ke `n_lists` cluster;
+# pencarian hanya membuka `nprobe` cluster yang centroid-nya paling mirip
+# dengan query, jadi biayanya ~ n_lists + nprobe * N / n_lists, bukan N.
+#
+# Vektor disimpan berurutan per cluster (ids[i] = baris df_all dari vectors[i]),
+# sehingga satu cluster = satu potongan array yang kontigu dan bisa di-mmap.
+class IVFIndex:
+    def __init__(self, components, centroids, offsets, ids, vectors, positions, nprobe=16, nnz=None):
+        self.components = components
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+        self.positions = positions
+        self.nprobe = nprobe
+        # nnz tfidf_matrix saat index dibangun, untuk mendeteksi index basi
+        self.nnz = nnz
+
+    # Jumlah baris tfidf_matrix yang ter-index; baris setelahnya (hasil
+    # append_films) tidak ada di index
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    # SVD dan k-means di-fit pada sampel (maks. `sample_size` baris), lalu
+    # semua baris diproyeksikan per batch. Default n_lists ~ sqrt(N).
+    @classmethod
+    def build(cls, tfidf_matrix, n_components=128, n_lists=None, nprobe=16, sample_size=100_000,
+              iterations=10, batch_size=65_536, seed=0):
+        from sklearn.decomposition import TruncatedSVD
+
+        rng = np.random.default_rng(seed)
+        n_rows = tfidf_matrix.shape[0]
+        n_components = min(n_components, n_rows - 1, tfidf_matrix.shape[1] - 1)
+        n_lists = n_lists or max(1, int(np.sqrt(n_rows)))
+        n_lists = min(n_lists, n_rows)
+
+        sample = np.sort(rng.choice(n_rows, min(sample_size, n_rows), replace=False))
+        svd = TruncatedSVD(n_components, random_state=seed).fit(tfidf_matrix[sample])
+        components = svd.components_.astype(np.float32)
+
+        vectors = np.empty((n_rows, n_components), dtype=np.float32)
+        for start in range(0, n_rows, batch_size):
+            vectors[start:start + batch_size] = _normalize(
+                tfidf_matrix[start:start + batch_size] @ components.T
+            )
+
+        centroids = _kmeans(vectors[sample], n_lists, iterations, rng)
+        assign = _assign(vectors, centroids, batch_size)
+
+        ids = np.argsort(assign, kind='stable')
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=offsets[1:])
+        positions = np.empty(n_rows, dtype=np.int64)
+        positions[ids] = np.arange(n_rows)
+        return cls(components, centroids, offsets, ids, vectors[ids], positions, nprobe, int(tfidf_matrix.nnz))
+
+    # Index cocok dengan matriks kalau baris yang ter-index masih sama
+    # (baris tambahan di akhir boleh)
+    def matches(self, tfidf_matrix):
+        return len(self) <= tfidf_matrix.shape[0] and self.nnz == int(tfidf_matrix.indptr[len(self)])
+
+    # Vektor tereduksi untuk baris sparse TF-IDF (misalnya film hasil append)
+    def project(self, rows):
+        return _normalize(np.asarray(rows @ self.components.T, dtype=np.float32))
+
+    # Vektor tereduksi satu baris df_all yang ter-index
+    def vector(self, idx):
+        return self.vectors[self.positions[idx]]
+
+    # Kandidat baris df_all untuk query: semua isi `nprobe` cluster terdekat,
+    # dipangkas ke `n_candidates` terbaik menurut skor tereduksi. Skor akhir
+    # dihitung ulang oleh pemanggil dengan TF-IDF asli.
+    def search(self, query, n_candidates, nprobe=None):
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe] if nprobe < self.n_lists \
+            else np.arange(self.n_lists)
+
+        slices = [slice(self.offsets[c], self.offsets[c + 1]) for c in probe]
+        ids = np.concatenate([self.ids[s] for s in slices])
+        if len(ids) <= n_candidates:
+            return ids
+        scores = np.concatenate([self.vectors[s] @ query for s in slices])
+        return ids[np.argpartition(-scores, n_candidates - 1)[:n_candidates]]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ('components', 'centroids', 'offsets', 'ids', 'vectors', 'positions'):
+            np.save(os.path.join(path, name + '.npy'), getattr(self, name))
+        manifest = {
+            'format': ANN_FORMAT,
+            'n_rows': len(self),
+            'n_components': int(self.components.shape[0]),
+            'n_lists': self.n_lists,
+            'nprobe': self.nprobe,
+            'nnz': self.nnz,
+        }
+        with open(os.path.join(path, ANN_MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, ANN_MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get('format') != ANN_FORMAT:
+            raise ValueError(f"Format index ANN tidak didukung: {manifest.get('format')!r}")
+
+        def load(name):
+            return np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+
+        return cls(
+            load('components'), load('centroids'), load('offsets'), load('ids'), load('vectors'),
+            load('positions'), manifest['nprobe'], manifest['nnz'],
+        )
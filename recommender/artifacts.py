@@ -0,0 +1,135 @@
+import json
+import os
+
+import numpy as np
+
+from .films import FilmTable, StringColumn
+from .title_index import TitleIndex
+
+# Artifact (*.pkl) ada di root repo, satu level di atas package ini
+ARTIFACT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Subfolder default untuk artifact format mmap (hasil `python -m recommender export`)
+MMAP_DIRNAME = 'artifacts'
+MANIFEST = 'manifest.json'
+MMAP_FORMAT = 1
+
+# Tandai array numpy sebagai read-only. Artifact dipakai bersama oleh semua
+# sesi/thread, jadi penulisan tidak sengaja harus gagal, bukan diam-diam
+# mengubah data milik sesi lain.
+def freeze(*arrays):
+    for array in arrays:
+        array.flags.writeable = False
+
+def _finish(films, tfidf_matrix, path):
+    title_index = TitleIndex(films['title'])
+    freeze(tfidf_matrix.data, tfidf_matrix.indices, tfidf_matrix.indptr)
+    return {
+        'films': films,
+        'tfidf_matrix': tfidf_matrix,
+        'title_index': title_index,
+        'path': path,
+        'vectorizer_path': os.path.join(path, 'tfidf_vectorizer.pkl'),
+    }
+
+# Format lama: tiga file joblib di root repo
+def load_pickled_artifacts(artifact_dir=ARTIFACT_DIR):
+    import joblib
+
+    df_all = joblib.load(os.path.join(artifact_dir, 'df_all.pkl'))
+    tfidf_matrix = joblib.load(os.path.join(artifact_dir, 'tfidf_matrix.pkl')).tocsr()
+    return _finish(FilmTable.from_frame(df_all), tfidf_matrix, artifact_dir)
+
+# Format mmap: array CSR mentah + kolom metadata sebagai .npy, di-load dengan
+# mmap_mode='r' sehingga beberapa proses berbagi page yang sama lewat OS cache
+# dan tidak ada pickle yang dieksekusi saat startup.
+def load_mmap_artifacts(path):
+    from scipy.sparse import csr_matrix
+
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != MMAP_FORMAT:
+        raise ValueError(f"Format artifact tidak didukung: {manifest.get('format')!r}")
+
+    def load(name):
+        return np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+
+    tfidf_matrix = csr_matrix(
+        (load('tfidf.data'), load('tfidf.indices'), load('tfidf.indptr')),
+        shape=tuple(manifest['shape']),
+        copy=False,
+    )
+
+    columns = {}
+    for name, kind in manifest['columns'].items():
+        if kind == 'string':
+            columns[name] = StringColumn(
+                load(f'films.{name}.bytes'), load(f'films.{name}.offsets'), load(f'films.{name}.nulls')
+            )
+        else:
+            columns[name] = load(f'films.{name}')
+
+    return _finish(FilmTable(columns), tfidf_matrix, path)
+
+# Pakai format mmap kalau ada manifest (di folder itu sendiri atau di
+# subfolder `artifacts/`), selain itu fallback ke pickle lama
+def load_artifacts(artifact_dir=ARTIFACT_DIR):
+    for path in (artifact_dir, os.path.join(artifact_dir, MMAP_DIRNAME)):
+        if os.path.exists(os.path.join(path, MANIFEST)):
+            return load_mmap_artifacts(path)
+    return load_pickled_artifacts(artifact_dir)
+
+def load_vectorizer(path):
+    import joblib
+
+    return joblib.load(path)
+
+# Tulis artifact format mmap dari DataFrame film, matriks TF-IDF dan vectorizer
+def write_mmap_artifacts(out_dir, df_all, tfidf_matrix, tfidf):
+    import joblib
+
+    os.makedirs(out_dir, exist_ok=True)
+    tfidf_matrix = tfidf_matrix.tocsr()
+    tfidf_matrix.sort_indices()
+
+    def save(name, array):
+        np.save(os.path.join(out_dir, name + '.npy'), np.ascontiguousarray(array))
+
+    save('tfidf.data', tfidf_matrix.data)
+    save('tfidf.indices', tfidf_matrix.indices)
+    save('tfidf.indptr', tfidf_matrix.indptr)
+
+    columns = {}
+    for name in df_all.columns:
+        values = df_all[name]
+        if values.dtype.kind not in 'biuf':
+            blob, offsets, nulls = StringColumn.encode(values)
+            save(f'films.{name}.bytes', blob)
+            save(f'films.{name}.offsets', offsets)
+            save(f'films.{name}.nulls', nulls)
+            columns[name] = 'string'
+        else:
+            save(f'films.{name}', values.to_numpy())
+            columns[name] = 'numeric'
+
+    joblib.dump(tfidf, os.path.join(out_dir, 'tfidf_vectorizer.pkl'))
+
+    manifest = {
+        'format': MMAP_FORMAT,
+        'n_rows': int(tfidf_matrix.shape[0]),
+        'shape': list(tfidf_matrix.shape),
+        'columns': columns,
+    }
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+# Konversi pickle lama (df_all.pkl, tfidf_matrix.pkl, tfidf_vectorizer.pkl)
+# ke format mmap
+def export_mmap_artifacts(out_dir, artifact_dir=ARTIFACT_DIR):
+    import joblib
+
+    df_all = joblib.load(os.path.join(artifact_dir, 'df_all.pkl'))
+    tfidf = joblib.load(os.path.join(artifact_dir, 'tfidf_vectorizer.pkl'))
+    tfidf_matrix = joblib.load(os.path.join(artifact_dir, 'tfidf_matrix.pkl'))
+    return write_mmap_artifacts(out_dir, df_all, tfidf_matrix, tfidf)
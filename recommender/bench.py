@@ -0,0 +1,211 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from .artifacts import ARTIFACT_DIR, MANIFEST
+from .build import BUILD_DIR
+from .text import make_queries
+
+BENCH_DIR = os.path.join(BUILD_DIR, 'bench')
+DEFAULT_SCALES = (4_000, 50_000, 500_000)
+
+# Metrik yang dibandingkan antar hasil benchmark (lebih kecil = lebih baik)
+COMPARED = ('cold_start_s', 'load_s', 'peak_rss_mb', 'p50_ms', 'p95_ms')
+
+
+# Katalog sintetis `n_films` film hasil resample df_all.pkl + tfidf_matrix.pkl,
+# ditulis dalam format mmap. Salinan ke-c sebuah film diberi judul
+# "<judul> <c>", jadi index judul berisi banyak judul mirip seperti katalog
+# besar sungguhan. Hasil disimpan dan dipakai ulang di builds/bench/.
+def synthesize_catalogue(n_films, artifact_dir=ARTIFACT_DIR, out_dir=None, seed=0):
+    import joblib
+    import numpy as np
+
+    from .artifacts import write_mmap_artifacts
+
+    out_dir = out_dir or os.path.join(BENCH_DIR, f'{n_films}-{seed}')
+    if os.path.exists(os.path.join(out_dir, MANIFEST)):
+        return out_dir
+
+    df_all = joblib.load(os.path.join(artifact_dir, 'df_all.pkl'))
+    tfidf_matrix = joblib.load(os.path.join(artifact_dir, 'tfidf_matrix.pkl')).tocsr()
+    tfidf = joblib.load(os.path.join(artifact_dir, 'tfidf_vectorizer.pkl'))
+
+    n_base = len(df_all)
+    rng = np.random.default_rng(seed)
+    if n_films <= n_base:
+        rows = np.sort(rng.choice(n_base, n_films, replace=False))
+    else:
+        rows = np.concatenate([np.arange(n_base), rng.integers(0, n_base, n_films - n_base)])
+
+    films = df_all.iloc[rows].reset_index(drop=True)
+    copy = np.zeros(n_films, dtype=np.int64)
+    seen = {}
+    for i, row in enumerate(rows.tolist()):
+        copy[i] = seen.get(row, 0)
+        seen[row] = copy[i] + 1
+    films['title'] = [t if c == 0 else f'{t} {c}' for t, c in zip(films['title'], copy.tolist())]
+
+    write_mmap_artifacts(out_dir, films, tfidf_matrix[rows], tfidf)
+    return out_dir
+
+def _latency(fn, args, repeat=1):
+    times = []
+    for arg in args:
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn(arg)
+            best = min(best, time.perf_counter() - started)
+        times.append(best)
+    times.sort()
+    return {
+        'n': len(times),
+        'p50_ms': round(statistics.median(times) * 1000, 4),
+        'p95_ms': round(times[int(0.95 * (len(times) - 1))] * 1000, 4),
+        'mean_ms': round(statistics.fmean(times) * 1000, 4),
+    }
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 if sys.platform != 'darwin' else peak / 1024 / 1024, 1)
+
+# Dijalankan di proses baru per skala: cold start dilaporkan begitu load +
+# query pertama selesai, lalu latency pencocokan judul dan rekomendasi
+# (tanpa cache engine, supaya yang diukur adalah pekerjaan sebenarnya)
+def _child(path, params):
+    from .engine import RecommenderEngine
+    from .metrics import metrics
+
+    started = time.perf_counter()
+    engine = RecommenderEngine(path, match_cache_size=0, neighbour_cache_size=0)
+    engine.load()
+    loaded = time.perf_counter()
+    engine.recommend_film(engine.title_index.titles[0], k=10)
+    first_query = time.perf_counter()
+    print(json.dumps({'ready': True}), flush=True)
+
+    result = {
+        'films': len(engine.films),
+        'load_s': round(loaded - started, 4),
+        'first_query_s': round(first_query - loaded, 4),
+        'rss_after_load_mb': _peak_rss_mb(),
+    }
+
+    queries = make_queries(engine.title_index.titles[:params['base_films']], params['queries'], params['seed'])
+    result['find_best_match'] = {
+        category: _latency(engine.find_best_match, qs, params['repeat'])
+        for category, qs in queries.items()
+    }
+
+    # Tahap mana yang menemukan judul, per kategori query (dari metrics)
+    metrics.enable()
+    for category, qs in queries.items():
+        metrics.reset()
+        for q in qs:
+            engine.find_best_match(q)
+        counters = metrics.snapshot()['counters'].get('match_stage', {})
+        result['find_best_match'][category]['resolved_by'] = {
+            label.split('=', 1)[1]: n for label, n in counters.items()
+        }
+    metrics.disable()
+
+    result['recommend_film'] = {
+        f'k={k}': _latency(lambda t: engine.recommend_film(t, k=k), queries['exact'], params['repeat'])
+        for k in (10, 90)
+    }
+    result['peak_rss_mb'] = _peak_rss_mb()
+    print(json.dumps(result), flush=True)
+
+def _run_scale(path, params):
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'recommender.bench', path, json.dumps(params)],
+        stdout=subprocess.PIPE, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    ready = process.stdout.readline()
+    if not ready:
+        process.wait()
+        raise RuntimeError(f'Benchmark gagal untuk {path} (exit {process.returncode})')
+    cold_start = time.perf_counter() - started
+    result = json.loads(process.stdout.readline())
+    if process.wait() != 0:
+        raise RuntimeError(f'Benchmark gagal untuk {path} (exit {process.returncode})')
+    return {'cold_start_s': round(cold_start, 4), **result}
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Jalankan benchmark untuk setiap skala dan kembalikan hasil (dict siap JSON)
+def run_benchmarks(scales=DEFAULT_SCALES, artifact_dir=ARTIFACT_DIR, queries=300, repeat=3, seed=0,
+                   progress=print):
+    import joblib
+    import numpy as np
+
+    base_films = len(joblib.load(os.path.join(artifact_dir, 'tfidf_matrix.pkl')).indptr) - 1
+    params = {'queries': queries, 'repeat': repeat, 'seed': seed, 'base_films': base_films}
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'params': params,
+        },
+        'scales': {},
+    }
+    for n_films in scales:
+        progress(f'📦 Katalog {n_films} film...')
+        path = synthesize_catalogue(n_films, artifact_dir, seed=seed)
+        progress(f'⏱️ Mengukur {n_films} film...')
+        report['scales'][str(n_films)] = _run_scale(path, params)
+    return report
+
+# Semua angka yang dibandingkan, sebagai {"50000.recommend_film.k=10.p50_ms": nilai}
+def _flatten(report):
+    values = {}
+
+    def walk(prefix, node):
+        for key, value in node.items():
+            name = f'{prefix}.{key}' if prefix else key
+            if isinstance(value, dict):
+                walk(name, value)
+            elif key in COMPARED and isinstance(value, (int, float)):
+                values[name] = value
+
+    walk('', report['scales'])
+    return values
+
+# Bandingkan dua hasil benchmark; metrik yang naik lebih dari `tolerance`
+# (relatif) dianggap regresi. Latency di bawah `min_ms` diabaikan karena
+# didominasi noise.
+def compare_reports(baseline, current, tolerance=0.2, min_ms=0.5):
+    old, new = _flatten(baseline), _flatten(current)
+    rows = []
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name], new[name]
+        if name.endswith('_ms') and max(before, after) < min_ms:
+            continue
+        change = (after - before) / before if before else 0.0
+        rows.append({'metric': name, 'before': before, 'after': after, 'change': round(change, 4),
+                     'regression': change > tolerance})
+    return rows
+
+
+if __name__ == '__main__':
+    _child(sys.argv[1], json.loads(sys.argv[2]))
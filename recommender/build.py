@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .artifacts import ARTIFACT_DIR, MANIFEST, write_mmap_artifacts
+
+BUILD_DIR = os.path.join(ARTIFACT_DIR, 'builds')
+
+# Kolom metadata film; yang digabung ke combined_features (urutan penting,
+# sama dengan df_all.pkl lama) adalah FEATURE_COLUMNS
+FILM_COLUMNS = ['id', 'title', 'genres', 'overview', 'keywords', 'director', 'cast', 'poster_url']
+FEATURE_COLUMNS = ['title', 'genres', 'director', 'cast', 'overview', 'keywords']
+
+# Parameter TfidfVectorizer yang dipakai artifact lama
+VECTORIZER_PARAMS = {'stop_words': 'english'}
+
+# Baca data mentah per chunk. Mendukung .csv, .jsonl/.json (satu film per
+# baris) dan .pkl (DataFrame, misalnya df_all.pkl lama).
+def read_chunks(source, chunk_size=50_000):
+    import pandas as pd
+
+    if source.endswith('.pkl'):
+        import joblib
+
+        df = joblib.load(source)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    elif source.endswith(('.jsonl', '.json')):
+        yield from pd.read_json(source, lines=True, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size)
+
+# Rapikan satu chunk: kolom yang tidak ada diisi NaN, lalu combined_features
+# = gabungan FEATURE_COLUMNS dengan spasi (nilai kosong jadi string kosong)
+def prepare_chunk(chunk):
+    import pandas as pd
+
+    if 'title' not in chunk.columns:
+        raise ValueError("Data mentah wajib punya kolom 'title'")
+
+    # Kolom dan teks tetap dtype object seperti df_all.pkl lama, supaya
+    # pickle-nya bisa dibaca versi pandas lain
+    chunk = chunk.reindex(columns=pd.Index(FILM_COLUMNS, dtype=object)).copy()
+    chunk = chunk[chunk['title'].notna()]
+    chunk['combined_features'] = (
+        chunk[FEATURE_COLUMNS].fillna('').astype(str).agg(' '.join, axis=1).astype(object)
+    )
+    return chunk
+
+
+# Worker: document frequency tiap term dalam satu chunk
+def _document_frequencies(docs):
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    counter = CountVectorizer(binary=True, **VECTORIZER_PARAMS)
+    try:
+        counts = counter.fit_transform(docs)
+    except ValueError:  # chunk tanpa term sama sekali
+        return {}
+    return dict(zip(counter.get_feature_names_out(), np.asarray(counts.sum(axis=0)).ravel().tolist()))
+
+_worker_vectorizer = None
+
+def _init_transform_worker(vectorizer):
+    global _worker_vectorizer
+    _worker_vectorizer = vectorizer
+
+def _transform(docs):
+    return _worker_vectorizer.transform(docs)
+
+# TfidfVectorizer dari document frequency gabungan. Hasilnya identik dengan
+# TfidfVectorizer(**VECTORIZER_PARAMS).fit(semua dokumen): vocabulary urut
+# alfabet dan idf = ln((1 + n) / (1 + df)) + 1 (smooth_idf).
+def vectorizer_from_frequencies(frequencies, n_documents):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    terms = sorted(frequencies)
+    df = np.array([frequencies[t] for t in terms], dtype=np.float64)
+    vectorizer = TfidfVectorizer(vocabulary={t: i for i, t in enumerate(terms)}, **VECTORIZER_PARAMS)
+    vectorizer.idf_ = np.log((1 + n_documents) / (1 + df)) + 1
+    return vectorizer
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Bangun ulang df_all, tfidf_vectorizer dan tfidf_matrix dari data mentah.
+# Hitung document frequency dan transform TF-IDF dibagi per chunk ke
+# beberapa proses. Yang di-chunk hanya pekerjaan TF-IDF: metadata film
+# disimpan utuh sekali (digabung setelah tahap 1, chunk langsung dibuang)
+# karena df_all.pkl dan format mmap ditulis dari satu tabel. Output ke builds/<version>/: pickle lama (bisa langsung
+# dipakai app) + format mmap, dengan manifest berisi jumlah film, ukuran
+# vocabulary dan checksum setiap file.
+def build_artifacts(source, out_dir=None, version=None, chunk_size=50_000, jobs=None, progress=print):
+    import pandas as pd
+    from scipy.sparse import vstack
+
+    version = version or time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+    out_dir = out_dir or os.path.join(BUILD_DIR, version)
+    jobs = jobs or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # 1. Baca data per chunk, document frequency dihitung paralel
+        chunks, pending = [], []
+        for chunk in read_chunks(source, chunk_size):
+            chunk = prepare_chunk(chunk)
+            chunks.append(chunk)
+            pending.append(pool.submit(_document_frequencies, chunk['combined_features'].to_numpy()))
+        frequencies = Counter()
+        for future in pending:
+            frequencies.update(future.result())
+        del pending
+        bounds = np.cumsum([0] + [len(chunk) for chunk in chunks])
+        df_all = pd.concat(chunks, ignore_index=True) if chunks else None
+        del chunks
+        n_documents = int(bounds[-1])
+        if not n_documents:
+            raise ValueError(f'Tidak ada film di {source}')
+        progress(f'📚 {n_documents} film, {len(frequencies)} term')
+
+        # 2. Fit vectorizer dari frekuensi gabungan
+        vectorizer = vectorizer_from_frequencies(frequencies, n_documents)
+
+    # 3. Transform paralel per potongan df_all (view, bukan salinan);
+    # vectorizer dikirim sekali per worker
+    features = df_all['combined_features'].to_numpy()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_transform_worker,
+                             initargs=(vectorizer,)) as pool:
+        parts = list(pool.map(_transform, [features[a:b] for a, b in zip(bounds[:-1], bounds[1:])]))
+    tfidf_matrix = vstack(parts, format='csr')
+    del parts
+    progress(f'🧮 TF-IDF {tfidf_matrix.shape[0]} x {tfidf_matrix.shape[1]}, nnz {tfidf_matrix.nnz}')
+
+    # 4. Tulis artifact + manifest
+    manifest = write_build(out_dir, df_all, tfidf_matrix, vectorizer, {
+        'version': version,
+        'source': os.path.abspath(source),
+        'build_seconds': round(time.perf_counter() - started, 2),
+    })
+    progress(f'✅ Artifact versi {version} ditulis ke {out_dir}')
+    return manifest
+
+# Tulis satu versi artifact: format mmap + pickle lama, lalu manifest dengan
+# info tambahan `info` dan checksum setiap file
+def write_build(out_dir, df_all, tfidf_matrix, vectorizer, info):
+    import joblib
+
+    manifest = write_mmap_artifacts(out_dir, df_all, tfidf_matrix, vectorizer)
+    joblib.dump(df_all, os.path.join(out_dir, 'df_all.pkl'))
+    joblib.dump(tfidf_matrix, os.path.join(out_dir, 'tfidf_matrix.pkl'))
+
+    manifest.update(info)
+    manifest.update({
+        'vocab_size': len(vectorizer.vocabulary_),
+        'nnz': int(tfidf_matrix.nnz),
+        'vectorizer_params': VECTORIZER_PARAMS,
+        'checksums': {
+            name: file_checksum(os.path.join(out_dir, name))
+            for name in sorted(os.listdir(out_dir)) if name != MANIFEST
+        },
+    })
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+# Tambah film dari `source` ke artifact yang sudah ada tanpa refit TF-IDF
+# (lihat RecommenderEngine.append_films), hasilnya ditulis sebagai versi
+# baru. Manifest mencatat drift IDF; kalau `needs_refit`, jalankan build penuh.
+def append_artifacts(source, artifact_dir, out_dir=None, version=None, chunk_size=50_000,
+                     progress=print):
+    from .engine import RecommenderEngine
+
+    version = version or time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+    out_dir = out_dir or os.path.join(BUILD_DIR, version)
+    started = time.perf_counter()
+
+    engine = RecommenderEngine(artifact_dir)
+    engine.load()
+    base_rows = len(engine.films)
+    report = None
+    for chunk in read_chunks(source, chunk_size):
+        report = engine.append_films(chunk)
+    if report is None or len(engine.films) == base_rows:
+        raise ValueError(f'Tidak ada film di {source}')
+    progress(f"➕ {len(engine.films) - base_rows} film ditambahkan, total {report['rows']}")
+
+    manifest = write_build(out_dir, engine.films.to_frame(), engine.tfidf_matrix, engine.tfidf, {
+        'version': version,
+        'source': os.path.abspath(source),
+        'base': os.path.abspath(artifact_dir),
+        'appended': len(engine.films) - base_rows,
+        'idf_drift': report['idf_drift'],
+        'needs_refit': report['needs_refit'],
+        'build_seconds': round(time.perf_counter() - started, 2),
+    })
+    progress(f"✅ Artifact versi {version} ditulis ke {out_dir} (drift IDF {report['idf_drift']:.4f})")
+    if report['needs_refit']:
+        progress('⚠️ Drift IDF tinggi, sebaiknya jalankan build penuh')
+    return manifest
+
+# Cek checksum semua file artifact terhadap manifest; kembalikan file yang tidak cocok
+def verify_artifacts(path):
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    return [
+        name for name, checksum in manifest.get('checksums', {}).items()
+        if not os.path.exists(os.path.join(path, name)) or file_checksum(os.path.join(path, name)) != checksum
+    ]
@@ -0,0 +1,617 @@
+import os
+import statistics
+import threading
+import time
+from itertools import islice
+
+import numpy as np
+
+from .ann import ANN_DIRNAME, ANN_MANIFEST, IVFIndex
+from .artifacts import ARTIFACT_DIR, freeze, load_artifacts, load_vectorizer
+from .cache import LRUCache
+from .facets import Facets
+from .films import Recommendations
+from .metrics import metrics
+from .query import QueryEncoder
+from .ranking import mmr, rank_candidates, top_k
+from .text import make_queries, normalize_string
+
+RESULT_COLUMNS = ['title', 'genres', 'overview', 'director', 'cast', 'poster_url']
+# Filter yang memilih paling banyak porsi katalog ini hanya menilai baris
+# yang lolos filter; di atas itu satu mat-vec penuh lebih murah
+SUBSET_SCORING_FRACTION = 0.2
+# Default jumlah kandidat untuk re-ranking MMR: MMR_POOL_FACTOR * k, minimal MMR_MIN_POOL
+MMR_POOL_FACTOR = 5
+MMR_MIN_POOL = 50
+# Batas sel matriks dense (baris seed x vocabulary) per potongan saat
+# memperbarui cache tetangga setelah append (2**22 sel = 32 MB float64)
+UPDATE_CHUNK_CELLS = 2 ** 22
+
+
+# Engine rekomendasi. Artifact baru di-load saat pertama kali dipakai,
+# jadi import package ini (untuk worker, test, benchmark) tetap murah.
+# Hasil pencocokan judul dan daftar tetangga per film disimpan di cache LRU
+# (opsional dengan TTL) yang dikosongkan setiap kali artifact di-reload.
+#
+# search='exact' menilai semua film (mat-vec sparse, linear terhadap ukuran
+# katalog). search='ann' memakai IVFIndex untuk memilih kandidat dulu, lalu
+# hanya kandidat itu yang dinilai dengan TF-IDF asli; cocok untuk katalog
+# besar, dengan recall yang bisa dicek lewat ann_recall().
+#
+# Selain judul, query bisa berupa deskripsi bebas (recommend_text): teks
+# diubah jadi vektor TF-IDF dengan vectorizer yang sama, lalu dinilai dan
+# diranking persis seperti satu film seed. Vektor query juga di-cache.
+#
+# Semua mode rekomendasi menerima `filters` (genres/director/cast, lihat
+# Facets); mask filter dipasang sebelum top-k, bukan menyaring hasil.
+class RecommenderEngine:
+    def __init__(self, artifact_dir=ARTIFACT_DIR, match_cache_size=4096,
+                 neighbour_cache_size=1024, cache_ttl=None, search='exact',
+                 ann_probes=None, ann_candidates=500, query_cache_size=1024):
+        if search not in ('exact', 'ann'):
+            raise ValueError(f"search harus 'exact' atau 'ann', bukan {search!r}")
+        self.artifact_dir = artifact_dir
+        self.search = search
+        self.ann_probes = ann_probes
+        self.ann_candidates = ann_candidates
+        self._artifacts = None
+        self._tfidf = None
+        self._ann = None
+        self._encoder = None
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self.match_cache = LRUCache(match_cache_size, ttl=cache_ttl)
+        self.neighbour_cache = LRUCache(neighbour_cache_size, ttl=cache_ttl)
+        self.query_cache = LRUCache(query_cache_size, ttl=cache_ttl)
+
+    @property
+    def loaded(self):
+        return self._artifacts is not None
+
+    def load(self):
+        if self._artifacts is None:
+            with self._lock:
+                if self._artifacts is None:
+                    with metrics.timer('load_artifacts'):
+                        self._artifacts = load_artifacts(self.artifact_dir)
+        return self._artifacts
+
+    # Buang artifact yang sudah di-load beserta semua cache hasil;
+    # artifact di-load ulang saat dipakai berikutnya
+    def reload(self):
+        with self._lock:
+            self._artifacts = None
+            self._tfidf = None
+            self._ann = None
+            self._encoder = None
+            self.match_cache.clear()
+            self.neighbour_cache.clear()
+            self.query_cache.clear()
+
+    def cache_stats(self):
+        return {
+            'match': self.match_cache.stats(),
+            'neighbours': self.neighbour_cache.stats(),
+            'queries': self.query_cache.stats(),
+        }
+
+    # Siapkan engine sebelum menerima traffic: load artifact, bangun semua
+    # yang lazy (facet, encoder query, index ANN kalau search='ann'), lalu
+    # jalankan `queries` query representatif (judul persis, potongan, typo,
+    # deskripsi, dengan filter) supaya page mmap sudah ada di page cache.
+    # Dipanggil di proses induk sebelum fork worker (lihat server.serve).
+    def warmup(self, queries=200, seed=0):
+        started = time.perf_counter()
+        self.load()
+        facets = self.facets
+        self.query_encoder
+        if self.search == 'ann':
+            self.ann_index
+
+        per_category = max(1, queries // 5)
+        samples = make_queries(self.title_index.titles, per_category, seed)
+        overviews = self.films['overview']
+        rows = np.random.default_rng(seed).integers(0, len(overviews), per_category)
+        texts = [' '.join(str(overviews[row]).split()[:12]) for row in rows.tolist()]
+        genres = [{'genres': [label]} for label, _ in facets['genres'].values(top=3)]
+
+        n = 0
+        for category, qs in samples.items():
+            for i, q in enumerate(qs):
+                filters = genres[i % len(genres)] if genres and i % 4 == 3 else None
+                result, _ = self.recommend_film(q, k=10, filters=filters)
+                if result is not None:
+                    result['title']
+                n += 1
+        for text in texts:
+            self.recommend_text(text, k=10)
+            n += 1
+        return {'queries': n, 'seconds': round(time.perf_counter() - started, 3)}
+
+    @property
+    def films(self):
+        return self.load()['films']
+
+    # Vectorizer (pickle sklearn) hanya di-load kalau benar-benar dipakai
+    @property
+    def tfidf(self):
+        if self._tfidf is None:
+            path = self.load()['vectorizer_path']
+            with self._lock:
+                if self._tfidf is None:
+                    with metrics.timer('load_vectorizer'):
+                        self._tfidf = load_vectorizer(path)
+        return self._tfidf
+
+    @property
+    def query_encoder(self):
+        if self._encoder is None:
+            tfidf = self.tfidf
+            with self._lock:
+                if self._encoder is None:
+                    self._encoder = QueryEncoder(tfidf)
+        return self._encoder
+
+    @property
+    def tfidf_matrix(self):
+        return self.load()['tfidf_matrix']
+
+    @property
+    def title_index(self):
+        return self.load()['title_index']
+
+    # Index facet dibangun saat pertama dipakai dan disimpan di dict artifact,
+    # jadi selalu sejalan dengan tabel film (termasuk setelah append_films)
+    @property
+    def facets(self):
+        artifacts = self.load()
+        facets = artifacts.get('facets')
+        if facets is None:
+            with self._update_lock:
+                artifacts = self._artifacts
+                facets = artifacts.get('facets')
+                if facets is None:
+                    with metrics.timer('build_facets'):
+                        facets = artifacts['facets'] = Facets.from_films(artifacts['films'])
+        return facets
+
+    # Mask baris yang lolos filter, None kalau tanpa filter
+    def filter_mask(self, filters):
+        key = Facets.key(filters)
+        if key is None:
+            return None
+        return self.facets.mask(key, self.tfidf_matrix.shape[0])
+
+    # Jumlah film per genre/director/cast di antara hasil rekomendasi
+    def facet_counts(self, result, names=('genres', 'director', 'cast'), top=10):
+        rows = result.indices if result is not None else np.array([], dtype=np.int64)
+        return self.facets.counts(rows, names, top)
+
+    # Index ANN dari <folder artifact>/ann (hasil `python -m recommender
+    # ann-build`). Kalau belum ada atau tidak cocok dengan matriks, index
+    # dibangun di memori.
+    @property
+    def ann_index(self):
+        if self._ann is None:
+            artifacts = self.load()
+            with self._lock:
+                if self._ann is None:
+                    path = os.path.join(artifacts['path'], ANN_DIRNAME)
+                    index = None
+                    if os.path.exists(os.path.join(path, ANN_MANIFEST)):
+                        index = IVFIndex.load(path)
+                        if not index.matches(artifacts['tfidf_matrix']):
+                            index = None
+                    self._ann = index or IVFIndex.build(artifacts['tfidf_matrix'])
+        return self._ann
+
+    def build_ann_index(self, **params):
+        index = IVFIndex.build(self.tfidf_matrix, **params)
+        self._ann = index
+        self.neighbour_cache.clear()
+        return index
+
+    # Hitung cosine similarity satu film terhadap semua film (on-demand).
+    # Baris tfidf_matrix sudah ter-normalisasi L2, jadi cosine = dot product
+    # sparse, tanpa perlu membangun matriks N x N di awal.
+    def similarity_scores(self, idx, mask=None):
+        return self.score_vector(self.tfidf_matrix[idx].toarray().ravel(), mask)
+
+    # Skor vektor query (dense) terhadap semua film; baris di luar `mask`
+    # diberi -inf. Kalau mask hanya memilih sebagian kecil katalog, hanya
+    # baris itu yang dinilai (skornya tetap identik, per baris dot product
+    # yang sama).
+    def score_vector(self, query, mask=None):
+        tfidf_matrix = self.tfidf_matrix
+        if mask is None:
+            return tfidf_matrix @ query
+        rows = np.flatnonzero(mask)
+        if len(rows) > SUBSET_SCORING_FRACTION * len(mask):
+            return np.where(mask, tfidf_matrix @ query, -np.inf)
+        scores = np.full(len(mask), -np.inf)
+        scores[rows] = tfidf_matrix[rows] @ query
+        return scores
+
+    # Index baris film yang paling cocok dengan input (None kalau tidak ada).
+    # Key cache = input yang sudah dinormalisasi, jadi "Toy Story" dan
+    # "toy-story " memakai entry yang sama. Input yang tidak ketemu juga di-cache.
+    def find_best_match(self, user_input):
+        key = normalize_string(user_input.strip())
+        idx = self.match_cache.get(key, default=False)
+        if idx is False:
+            idx = self.title_index.find_best_match(user_input)
+            self.match_cache.put(key, idx)
+        else:
+            metrics.count('match_stage', stage='cache')
+        return idx
+
+    # Daftar tetangga (index, similarity) satu film, sudah terurut.
+    # Array hasil dibagi antar pemanggil lewat cache, jadi dibuat read-only.
+    # Mode ANN hanya dipakai kalau k dibatasi; daftar lengkap (k=None) selalu exact.
+    def neighbours(self, idx, k=None, min_similarity=0.09, filters=None):
+        filter_key = Facets.key(filters)
+        key = (idx, k, min_similarity, filter_key)
+        cached = self.neighbour_cache.get(key)
+        metrics.count('neighbours', source='computed' if cached is None else 'cache')
+        if cached is None:
+            mask = self.facets.mask(filter_key, self.tfidf_matrix.shape[0]) if filter_key else None
+            if self._use_ann(k, mask):
+                cached = self.ann_neighbours(idx, k, min_similarity, mask=mask)
+            else:
+                cached = self.exact_neighbours(idx, k, min_similarity, mask)
+            freeze(*cached)
+            self.neighbour_cache.put(key, cached)
+        return cached
+
+    # Filter yang sangat selektif dinilai exact (murah karena hanya baris
+    # yang lolos filter); kandidat ANN bisa saja hampir tidak ada yang lolos
+    def _use_ann(self, k, mask):
+        if self.search != 'ann' or k is None:
+            return False
+        return mask is None or np.count_nonzero(mask) > SUBSET_SCORING_FRACTION * len(mask)
+
+    def exact_neighbours(self, idx, k=None, min_similarity=0.09, mask=None):
+        with metrics.timer('similarity'):
+            scores = self.similarity_scores(idx, mask)
+        with metrics.timer('ranking'):
+            result_indices = top_k(scores, k=k, min_similarity=min_similarity, exclude=[idx])
+        return result_indices, scores[result_indices]
+
+    def ann_neighbours(self, idx, k, min_similarity=0.09, nprobe=None, mask=None):
+        ann = self.ann_index
+        row = self.tfidf_matrix[idx]
+        reduced = ann.vector(idx) if idx < len(ann) else ann.project(row)[0]
+        return self._ann_rank(row.toarray().ravel(), reduced, k, min_similarity, nprobe, exclude=idx, mask=mask)
+
+    # Kandidat dari index ANN, skor akhirnya tetap cosine TF-IDF yang sama
+    # persis dengan mode exact
+    def _ann_rank(self, query, reduced, k, min_similarity, nprobe=None, exclude=None, mask=None):
+        ann = self.ann_index
+        tfidf_matrix = self.tfidf_matrix
+        with metrics.timer('ann_search'):
+            candidates = ann.search(reduced, max(self.ann_candidates, k), nprobe or self.ann_probes)
+        # Film hasil append_films belum ter-index, jadi selalu ikut dinilai
+        candidates = np.concatenate([candidates, np.arange(len(ann), tfidf_matrix.shape[0])])
+        with metrics.timer('similarity'):
+            scores = tfidf_matrix[candidates] @ query
+        with metrics.timer('ranking'):
+            keep = scores >= min_similarity
+            if exclude is not None:
+                keep &= candidates != exclude
+            if mask is not None:
+                keep &= mask[candidates]
+            return rank_candidates(candidates[keep], scores[keep], k)
+
+    # Recall@k mode ANN terhadap mode exact untuk `sample` film acak, plus
+    # median latency kedua mode (tanpa cache)
+    def ann_recall(self, k=10, sample=200, min_similarity=0.09, nprobe=None, seed=0):
+        rng = np.random.default_rng(seed)
+        n_rows = self.tfidf_matrix.shape[0]
+        rows = rng.choice(n_rows, min(sample, n_rows), replace=False)
+        self.ann_index  # load/build index di luar pengukuran
+        found = total = 0
+        exact_times, ann_times = [], []
+        for idx in rows.tolist():
+            started = time.perf_counter()
+            exact = self.exact_neighbours(idx, k, min_similarity)[0]
+            exact_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            approx = self.ann_neighbours(idx, k, min_similarity, nprobe)[0]
+            ann_times.append(time.perf_counter() - started)
+            found += len(np.intersect1d(exact, approx))
+            total += len(exact)
+        return {
+            'k': k,
+            'sample': len(rows),
+            'recall': found / total if total else 1.0,
+            'exact_ms': statistics.median(exact_times) * 1000,
+            'ann_ms': statistics.median(ann_times) * 1000,
+        }
+
+    # Ubah seed (judul atau index baris) menjadi index baris df_all
+    def resolve_seed(self, seed):
+        if isinstance(seed, (int, np.integer)):
+            return int(seed) if 0 <= seed < len(self.title_index) else None
+        return self.find_best_match(seed)
+
+    # Hasil dari index film dan similarity-nya; metadata dibaca dari tabel
+    # film saat diakses, tidak disalin
+    def build_result(self, result_indices, similarities):
+        if not len(result_indices):
+            return None
+        with metrics.timer('build_result'):
+            return Recommendations(self.films, result_indices, similarities, RESULT_COLUMNS)
+
+    # Re-ranking MMR untuk hasil (index, similarity) yang sudah terurut:
+    # similarity antar kandidat dihitung hanya di dalam kandidat itu
+    # (M x M sparse), lalu k film dipilih greedy. Similarity yang
+    # dikembalikan tetap similarity ke query.
+    def diversify(self, result_indices, similarities, k=None, mmr_lambda=0.7):
+        if not 0 <= mmr_lambda <= 1:
+            raise ValueError(f'mmr_lambda harus di antara 0 dan 1, bukan {mmr_lambda!r}')
+        if not len(result_indices):
+            return result_indices, similarities
+        with metrics.timer('mmr'):
+            vectors = self.tfidf_matrix[result_indices]
+            pairwise = (vectors @ vectors.T).toarray()
+            order = mmr(similarities, pairwise, k, mmr_lambda)
+        return result_indices[order], similarities[order]
+
+    # Jumlah kandidat teratas yang di-re-rank MMR untuk output k film, minimal
+    # k. k=None (semua film di atas threshold) hanya bisa dengan mmr_candidates
+    # eksplisit, supaya similarity antar kandidat tidak pernah N x N.
+    @staticmethod
+    def mmr_pool(k, mmr_candidates=None):
+        if k is None:
+            if not mmr_candidates:
+                raise ValueError('MMR dengan k=None butuh mmr_candidates (jumlah kandidat yang di-re-rank)')
+            return mmr_candidates
+        return max(mmr_candidates or max(MMR_POOL_FACTOR * k, MMR_MIN_POOL), k)
+
+    # Fungsi rekomendasi film. Dengan mmr_lambda (0..1), hasil dipilih dari
+    # `mmr_candidates` tetangga teratas supaya tidak berisi film yang mirip
+    # satu sama lain (sekuel, sutradara yang sama); makin kecil lambda makin beragam.
+    def recommend_film(self, title, k=None, min_similarity=0.09, filters=None, mmr_lambda=None,
+                       mmr_candidates=None):
+        # Cari index film yang dicari
+        idx = self.find_best_match(title)
+        if idx is None:
+            return None, None
+        original_title = self.title_index.titles[idx]
+
+        # Film yang dicari sendiri tidak ikut
+        if mmr_lambda is None:
+            result_indices, similarities = self.neighbours(idx, k, min_similarity, filters)
+        else:
+            candidates = self.neighbours(idx, self.mmr_pool(k, mmr_candidates), min_similarity, filters)
+            result_indices, similarities = self.diversify(*candidates, k, mmr_lambda)
+
+        result = self.build_result(result_indices, similarities)
+        if result is None:
+            return None, None
+        return result, original_title
+
+    # Tambah film baru tanpa refit TF-IDF: hanya baris baru yang di-transform
+    # dengan vectorizer yang sudah ada, lalu ditambahkan ke matriks, tabel film
+    # dan index judul. Daftar tetangga di cache hanya diperbarui kalau film
+    # baru masuk ke hasilnya. Laporan berisi drift IDF untuk menilai kapan
+    # refit penuh (`python -m recommender build`) perlu dijalankan.
+    def append_films(self, new_films):
+        from scipy.sparse import vstack
+
+        from .build import prepare_chunk
+        from .update import staleness_report
+
+        new_films = prepare_chunk(new_films)
+        docs = new_films['combined_features'].tolist()
+        tfidf = self.tfidf
+        self.load()
+
+        with self._update_lock:
+            artifacts = self._artifacts
+            start = artifacts['tfidf_matrix'].shape[0]
+            tfidf_matrix = vstack([artifacts['tfidf_matrix'], tfidf.transform(docs)], format='csr')
+            freeze(tfidf_matrix.data, tfidf_matrix.indices, tfidf_matrix.indptr)
+
+            # Matriks, tabel dan facet baru dipasang dulu, baru index judul
+            # yang menunjuk ke baris-baris baru itu
+            facets = artifacts.get('facets')
+            self._artifacts = {
+                **artifacts,
+                'films': artifacts['films'].append(new_films),
+                'tfidf_matrix': tfidf_matrix,
+                'facets': facets.append(new_films) if facets is not None else None,
+            }
+            artifacts['title_index'].extend(new_films['title'])
+            self.match_cache.clear()
+            updated = self._update_neighbours(tfidf_matrix, start)
+
+        report = staleness_report(tfidf, tfidf_matrix, docs)
+        report.update({
+            'appended': len(new_films),
+            'rows': tfidf_matrix.shape[0],
+            'neighbour_lists_updated': updated,
+        })
+        return report
+
+    # Gabungkan film baru (baris >= start) ke daftar tetangga yang ada di cache
+    def _update_neighbours(self, tfidf_matrix, start):
+        entries = self.neighbour_cache.items()
+        if not entries:
+            return 0
+
+        by_row = {}
+        for key, value in entries:
+            by_row.setdefault(key[0], []).append((key, value))
+        rows = sorted(by_row)
+        new_rows = tfidf_matrix[start:]
+        new_ids = np.arange(start, tfidf_matrix.shape[0])
+        # Baris seed di-densify per potongan, jadi memori tidak tergantung
+        # jumlah entri cache
+        chunk_size = max(1, UPDATE_CHUNK_CELLS // max(tfidf_matrix.shape[1], len(new_ids)))
+        masks = {}
+
+        updated = 0
+        for chunk_start in range(0, len(rows), chunk_size):
+            chunk = rows[chunk_start:chunk_start + chunk_size]
+            # Urutan perkalian sama dengan similarity_scores, jadi skornya identik;
+            # order='F' supaya .T sudah C-contiguous (tanpa salinan kedua)
+            sims = (new_rows @ tfidf_matrix[chunk].toarray(order='F').T).T
+            for position, idx in enumerate(chunk):
+                scores = sims[position]
+                for key, (indices, values) in by_row[idx]:
+                    _, k, min_similarity, filter_key = key
+                    keep = scores >= min_similarity
+                    if filter_key is not None:
+                        if filter_key not in masks:
+                            masks[filter_key] = self.facets.mask(filter_key, tfidf_matrix.shape[0])[start:]
+                        keep &= masks[filter_key]
+                    if not keep.any():
+                        continue
+                    # Skor sama kalah dari film lama (index lebih kecil)
+                    if k is not None and len(values) >= k and (k == 0 or scores[keep].max() <= values[-1]):
+                        continue
+
+                    merged = rank_candidates(
+                        np.concatenate([indices, new_ids[keep]]), np.concatenate([values, scores[keep]]), k
+                    )
+                    freeze(*merged)
+                    self.neighbour_cache.put(key, merged)
+                    updated += 1
+        return updated
+
+    # Vektor TF-IDF query teks bebas: (indices, values, term yang dikenali).
+    # Key cache = teks lowercase dengan spasi dirapikan.
+    def encode_query(self, text):
+        key = ' '.join(text.lower().split())
+        cached = self.query_cache.get(key)
+        metrics.count('queries', source='computed' if cached is None else 'cache')
+        if cached is None:
+            with metrics.timer('encode_query'):
+                cached = self.query_encoder.encode(text)
+            self.query_cache.put(key, cached)
+        return cached
+
+    # Daftar (index, similarity) film untuk vektor query, terurut
+    def text_neighbours(self, indices, values, k=None, min_similarity=0.09, mask=None):
+        query = self.query_encoder.dense(indices, values)
+        if self._use_ann(k, mask):
+            from scipy.sparse import csr_matrix
+
+            row = csr_matrix((values, indices, [0, len(indices)]), shape=(1, len(query)))
+            return self._ann_rank(query, self.ann_index.project(row)[0], k, min_similarity, mask=mask)
+
+        with metrics.timer('similarity'):
+            scores = self.score_vector(query, mask)
+        with metrics.timer('ranking'):
+            result_indices = top_k(scores, k=k, min_similarity=min_similarity)
+        return result_indices, scores[result_indices]
+
+    # Rekomendasi dari deskripsi bebas (plot, aktor, sutradara, genre).
+    # Hasil: (hasil, term yang dikenali); (None, term) kalau tidak ada film
+    # yang cukup mirip atau tidak ada kata yang ada di vocabulary.
+    def recommend_text(self, text, k=None, min_similarity=0.09, filters=None, mmr_lambda=None,
+                       mmr_candidates=None):
+        indices, values, terms = self.encode_query(text)
+        if not len(indices):
+            return None, terms
+        mask = self.filter_mask(filters)
+        if mmr_lambda is None:
+            result_indices, similarities = self.text_neighbours(indices, values, k, min_similarity, mask)
+        else:
+            pool = self.mmr_pool(k, mmr_candidates)
+            candidates = self.text_neighbours(indices, values, pool, min_similarity, mask)
+            result_indices, similarities = self.diversify(*candidates, k, mmr_lambda)
+        return self.build_result(result_indices, similarities), terms
+
+    # Rekomendasi dari beberapa film favorit sekaligus.
+    # Vektor TF-IDF film-film tersebut digabung menjadi satu profil (centroid
+    # berbobot, dinormalisasi L2), lalu dinilai dengan satu mat-vec sparse,
+    # jadi 10 film seed biayanya hampir sama dengan 1 film.
+    def recommend_profile(self, titles, weights=None, k=None, min_similarity=0.09, filters=None):
+        if weights is None:
+            weights = [1.0] * len(titles)
+        elif len(weights) != len(titles):
+            raise ValueError(f'Jumlah weights ({len(weights)}) harus sama dengan jumlah judul ({len(titles)})')
+
+        rows, row_weights = [], []
+        for seed, weight in zip(titles, weights):
+            idx = self.resolve_seed(seed)
+            if idx is not None:
+                rows.append(idx)
+                row_weights.append(weight)
+        if not rows:
+            return None, None
+
+        tfidf_matrix = self.tfidf_matrix
+        profile = np.asarray(row_weights, dtype=np.float64) @ tfidf_matrix[rows]
+        norm = np.linalg.norm(profile)
+        if norm == 0:
+            return None, None
+
+        with metrics.timer('similarity'):
+            scores = self.score_vector(profile / norm, self.filter_mask(filters))
+        with metrics.timer('ranking'):
+            result_indices = top_k(scores, k=k, min_similarity=min_similarity, exclude=rows)
+
+        result = self.build_result(result_indices, scores[result_indices])
+        if result is None:
+            return None, None
+        return result, [self.title_index.titles[i] for i in dict.fromkeys(rows)]
+
+    # Rekomendasi untuk banyak seed sekaligus, bisa dipakai tanpa Streamlit.
+    # Similarity dihitung per chunk sebagai satu perkalian matriks sparse dan
+    # hasilnya di-yield per seed: (seed, idx, neighbour_indices, similarities).
+    # Seed yang tidak ditemukan tetap di-yield dengan idx None dan hasil kosong.
+    def recommend_batch(self, seeds, k=20, min_similarity=0.09, chunk_size=256, filters=None):
+        tfidf_matrix = self.tfidf_matrix
+        mask = self.filter_mask(filters)
+        empty = np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+        seeds = iter(seeds)
+        while True:
+            chunk = [(seed, self.resolve_seed(seed)) for seed in islice(seeds, chunk_size)]
+            if not chunk:
+                return
+
+            rows = [idx for _, idx in chunk if idx is not None]
+            # (N x c) lalu transpose: hanya potongan kecil yang dikonversi
+            sims = (tfidf_matrix @ tfidf_matrix[rows].T).T.tocsr() if rows else None
+
+            r = 0
+            for seed, idx in chunk:
+                if idx is None:
+                    yield (seed, None) + empty
+                    continue
+
+                if min_similarity > 0:
+                    # Skor nol tidak tersimpan di matriks sparse, cukup pakai nonzero
+                    start, end = sims.indptr[r], sims.indptr[r + 1]
+                    candidates, values = sims.indices[start:end], sims.data[start:end]
+                    keep = (values >= min_similarity) & (candidates != idx)
+                    if mask is not None:
+                        keep &= mask[candidates]
+                    neighbours, similarities = rank_candidates(
+                        candidates[keep].astype(np.int64), values[keep], k
+                    )
+                else:
+                    scores = sims[r].toarray().ravel()
+                    if mask is not None:
+                        scores[~mask] = -np.inf
+                    neighbours = top_k(scores, k=k, min_similarity=min_similarity, exclude=[idx])
+                    similarities = scores[neighbours]
+
+                r += 1
+                yield seed, idx, neighbours, similarities
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+# Engine bersama untuk seluruh proses (dibuat sekali, load tetap lazy)
+def get_engine():
+    global _default_engine
+    if _default_engine is None:
+        with _default_lock:
+            if _default_engine is None:
+                _default_engine = RecommenderEngine()
+    return _default_engine
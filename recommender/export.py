@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+from .metrics import metrics
+from .ranking import rank_candidates
+
+EXPORT_FORMATS = ('csv', 'parquet')
+EXPORT_COLUMNS = ('film_row', 'film_id', 'neighbour_row', 'neighbour_id', 'rank', 'score')
+PROGRESS_FILE = '_progress.json'
+# Ukuran blok default: sel matriks similarity dense per blok (2**23 sel =
+# 64 MB float64; puncak sekitar 3x itu dengan hasil perkalian sparse dan
+# index argpartition), jadi memori tidak tergantung ukuran katalog
+EXPORT_BLOCK_CELLS = 2 ** 23
+PROGRESS_INTERVAL = 5.0
+
+
+class _CSVPart:
+    def __init__(self, path, ids):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(EXPORT_COLUMNS)
+        # id film sebagai teks sekali saja; id kosong (NaN) jadi sel kosong
+        self.labels = [str(int(v)) if v == v else '' for v in ids.tolist()] if ids is not None else None
+
+    def write(self, films, neighbours, rank, score):
+        labels = self.labels
+        film_ids = [labels[r] for r in films.tolist()] if labels else films.tolist()
+        neighbour_ids = [labels[r] for r in neighbours.tolist()] if labels else neighbours.tolist()
+        self.writer.writerows(zip(films.tolist(), film_ids, neighbours.tolist(), neighbour_ids,
+                                  rank.tolist(), score.tolist()))
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetPart:
+    def __init__(self, path, ids):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('Format parquet butuh pyarrow (pip install pyarrow)') from None
+
+        self.pa = pa
+        self.ids = ids
+        self.schema = pa.schema([
+            ('film_row', pa.int64()), ('film_id', pa.int64()),
+            ('neighbour_row', pa.int64()), ('neighbour_id', pa.int64()),
+            ('rank', pa.int16()), ('score', pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def _ids(self, rows):
+        if self.ids is None:
+            return self.pa.array(rows)
+        values = self.ids[rows]
+        missing = np.isnan(values)
+        return self.pa.array(np.where(missing, 0, values).astype(np.int64), mask=missing)
+
+    # Satu blok = satu row group
+    def write(self, films, neighbours, rank, score):
+        pa = self.pa
+        table = pa.Table.from_arrays(
+            [pa.array(films), self._ids(films), pa.array(neighbours), self._ids(neighbours),
+             pa.array(rank.astype(np.int16)), pa.array(score)],
+            schema=self.schema,
+        )
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+_WRITERS = {'csv': _CSVPart, 'parquet': _ParquetPart}
+
+
+# Top-k tetangga untuk baris start..end: similarity blok dihitung sebagai
+# matriks dense (blok x N) dari satu perkalian sparse, lalu argpartition
+# per baris. Urutan sama dengan rank_candidates (skor menurun, index naik,
+# termasuk skor sama di batas ke-k).
+def block_neighbours(matrix, matrix_t, start, end, k, min_similarity=0.0):
+    n = end - start
+    with metrics.timer('export_similarity'):
+        scores = (matrix[start:end] @ matrix_t).toarray()
+    with metrics.timer('export_ranking'):
+        # Dinegasikan di tempat (tanpa salinan kedua), film itu sendiri paling akhir
+        np.negative(scores, out=scores)
+        scores[np.arange(n), np.arange(start, end)] = np.inf
+        k = min(k, scores.shape[1] - 1)
+        if k <= 0:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, empty, np.array([], dtype=np.float64)
+        part = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(scores, part, axis=1)
+        order = np.lexsort((part, values), axis=1)
+        part = np.take_along_axis(part, order, axis=1)
+        values = -np.take_along_axis(values, order, axis=1)
+
+        # Baris yang skor ke-k-nya sama dengan skor di luar partisi diurutkan
+        # ulang seperti rank_candidates (skor sama -> index kecil dulu);
+        # skor yang toh dibuang (nol / di bawah min_similarity) dilewati
+        kth = values[:, -1]
+        tied = np.flatnonzero((kth > 0) & (kth >= min_similarity)
+                              & (np.count_nonzero(scores <= -kth[:, None], axis=1) > k))
+        candidates = np.arange(scores.shape[1])
+        for r in tied.tolist():
+            part[r], values[r] = rank_candidates(candidates, -scores[r], k)
+
+        # Skor nol = tidak ada term yang sama, tidak ikut diekspor
+        keep = (values > 0) & (values >= min_similarity)
+        films = np.repeat(np.arange(start, end, dtype=np.int64), k).reshape(n, k)[keep]
+        rank = np.broadcast_to(np.arange(1, k + 1), (n, k))[keep]
+        return films, part[keep].astype(np.int64), rank, values[keep]
+
+def _fingerprint(matrix):
+    return f'{matrix.shape[0]}x{matrix.shape[1]}:{matrix.nnz}:{zlib.crc32(np.ascontiguousarray(matrix.indptr)):08x}'
+
+def _write_progress(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+# Ekspor tabel "top-k film mirip" untuk seluruh katalog ke folder `out_dir`
+# sebagai part-00000.csv/.parquet, ... (tiap part `part_rows` film, ditulis
+# per blok `block_size` film). Kolom: baris + id film, baris + id tetangga,
+# rank (1..k) dan cosine similarity. Memori puncak ditentukan block_size,
+# bukan ukuran katalog.
+#
+# Part yang selesai dicatat di _progress.json dan ditulis lewat file .tmp
+# yang di-rename, jadi dengan resume=True ekspor yang terputus dilanjutkan
+# dari part pertama yang belum selesai (parameter harus sama).
+def export_neighbours(engine, out_dir, k=20, min_similarity=0.0, fmt='csv', block_size=None,
+                      part_rows=50_000, resume=False, progress=print):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format harus salah satu dari {', '.join(EXPORT_FORMATS)}, bukan {fmt!r}")
+    if k <= 0 or part_rows <= 0:
+        raise ValueError('k dan part_rows harus > 0')
+
+    matrix = engine.tfidf_matrix
+    n_films = matrix.shape[0]
+    block_size = block_size or max(1, EXPORT_BLOCK_CELLS // n_films)
+    block_size = min(block_size, part_rows)
+    films = engine.films
+    ids = np.asarray(films['id'], dtype=np.float64) if 'id' in films.columns else None
+
+    params = {'format': fmt, 'k': k, 'min_similarity': min_similarity, 'part_rows': part_rows,
+              'fingerprint': _fingerprint(matrix)}
+    progress_path = os.path.join(out_dir, PROGRESS_FILE)
+    if os.path.exists(progress_path):
+        if not resume:
+            raise FileExistsError(f'{out_dir} sudah berisi hasil ekspor; pakai resume atau folder lain')
+        with open(progress_path) as f:
+            state = json.load(f)
+        changed = [name for name, value in params.items() if state.get(name) != value]
+        if changed:
+            raise ValueError(f"Tidak bisa resume, parameter/artifact berbeda: {', '.join(changed)}")
+    else:
+        state = dict(params, n_films=n_films, parts=[], complete=False)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):
+        if name.endswith('.tmp'):
+            os.remove(os.path.join(out_dir, name))
+
+    done = {part['start'] for part in state['parts']}
+    total = sum(min(part_rows, n_films - start) for start in range(0, n_films, part_rows) if start not in done)
+    if done:
+        progress(f'⏭️ Melanjutkan ekspor: {len(done)} part sudah selesai')
+    progress(f'📤 Ekspor top-{k} untuk {total} film, blok {block_size} film, format {fmt}')
+
+    # Transpose CSR sekali: perkalian blok x M.T paling cepat dengan M.T
+    # dalam format CSR (memori = satu salinan matriks TF-IDF)
+    matrix_t = matrix.T.tocsr()
+    started = last_report = time.perf_counter()
+    processed = 0
+    for number, start in enumerate(range(0, n_films, part_rows)):
+        if start in done:
+            continue
+        end = min(start + part_rows, n_films)
+        name = f'part-{number:05d}.{fmt}'
+        path = os.path.join(out_dir, name)
+        writer = _WRITERS[fmt](path + '.tmp', ids)
+        rows = 0
+        try:
+            for block_start in range(start, end, block_size):
+                block_end = min(block_start + block_size, end)
+                block = block_neighbours(matrix, matrix_t, block_start, block_end, k, min_similarity)
+                writer.write(*block)
+                rows += len(block[0])
+                processed += block_end - block_start
+
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    rate = processed / (now - started)
+                    progress(f'⏳ {processed}/{total} film ({rate:.0f} film/s, sisa ~{(total - processed) / rate:.0f} s)')
+        finally:
+            writer.close()
+        os.replace(path + '.tmp', path)
+
+        state['parts'].append({'file': name, 'start': start, 'end': end, 'rows': rows})
+        state['parts'].sort(key=lambda part: part['start'])
+        _write_progress(progress_path, state)
+        progress(f'💾 {name}: film {start}-{end - 1}, {rows} baris')
+
+    state['complete'] = True
+    state['rows'] = sum(part['rows'] for part in state['parts'])
+    _write_progress(progress_path, state)
+    progress(f"✅ {state['rows']} baris ditulis ke {out_dir} ({time.perf_counter() - started:.1f} s)")
+    return state
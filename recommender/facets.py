@@ -0,0 +1,157 @@
+import numpy as np
+
+from .artifacts import freeze
+
+# Kolom df_all yang bisa dipakai sebagai filter; nilainya dipisah koma
+FACET_COLUMNS = ('genres', 'director', 'cast')
+SEPARATOR = ','
+# Placeholder di data mentah, tidak dianggap sebagai nilai facet
+MISSING_VALUES = {'', 'unknown', 'unknown cast', 'unknown director', 'nan', 'none'}
+
+
+# Satu facet (mis. genres) sebagai kode kategori per baris, format CSR:
+# codes[indptr[i]:indptr[i + 1]] = kode nilai-nilai baris i. Kebalikannya
+# (baris per nilai, urut) disimpan dengan cara yang sama di postings, jadi
+# mask satu nilai = satu potongan array, bukan operasi string per film.
+class FacetIndex:
+    def __init__(self, labels, indptr, codes):
+        self.labels = labels
+        self.lookup = {}
+        for code, label in enumerate(labels):
+            self.lookup.setdefault(label.lower(), code)
+        self.indptr = indptr
+        self.codes = codes
+
+        rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+        order = np.argsort(codes, kind='stable')
+        self.posting_rows = rows[order]
+        self.posting_indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(labels)), out=self.posting_indptr[1:])
+        freeze(self.indptr, self.codes, self.posting_rows, self.posting_indptr)
+
+    # Parse kolom teks ("Action, Drama") sekali; kode baru ditambahkan ke
+    # `labels`, jadi kode yang sudah ada tidak berubah saat katalog di-append
+    @staticmethod
+    def parse(values, labels, lookup):
+        lengths, codes = [], []
+        # String yang sama (mis. "Comedy, Drama") cukup di-parse sekali
+        parsed = {}
+        for value in values:
+            row = parsed.get(value) if isinstance(value, str) else ()
+            if row is None:
+                row = []
+                for part in value.split(SEPARATOR):
+                    part = part.strip()
+                    if part.lower() in MISSING_VALUES:
+                        continue
+                    code = lookup.get(part)
+                    if code is None:
+                        code = lookup[part] = len(labels)
+                        labels.append(part)
+                    row.append(code)
+                row = parsed[value] = tuple(row)
+            codes.extend(row)
+            lengths.append(len(row))
+        return lengths, codes
+
+    @classmethod
+    def from_values(cls, values):
+        labels, lookup = [], {}
+        lengths, codes = cls.parse(values, labels, lookup)
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        return cls(labels, indptr, np.array(codes, dtype=np.int32))
+
+    # Index baru = index ini + baris `values` di akhir
+    def append(self, values):
+        labels = list(self.labels)
+        lengths, codes = self.parse(values, labels, {label: code for code, label in enumerate(labels)})
+        indptr = np.concatenate([self.indptr, self.indptr[-1] + np.cumsum(lengths, dtype=np.int64)])
+        return FacetIndex(labels, indptr, np.concatenate([self.codes, np.array(codes, dtype=np.int32)]))
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    # Kode nilai (tanpa membedakan huruf besar/kecil), None kalau tidak ada
+    def code(self, label):
+        return self.lookup.get(label.strip().lower())
+
+    # Baris yang punya nilai `label`, urut
+    def rows(self, label):
+        code = self.code(label)
+        if code is None:
+            return self.posting_rows[:0]
+        return self.posting_rows[self.posting_indptr[code]:self.posting_indptr[code + 1]]
+
+    # Mask `n_rows` baris: True untuk baris yang punya salah satu dari `labels`
+    def mask(self, labels, n_rows=None):
+        n_rows = len(self) if n_rows is None else n_rows
+        mask = np.zeros(n_rows, dtype=bool)
+        for label in labels:
+            rows = self.rows(label)
+            mask[rows[:np.searchsorted(rows, n_rows)]] = True
+        return mask
+
+    # Jumlah film per nilai di antara `rows` (mis. hasil rekomendasi),
+    # terurut menurun: [(label, jumlah), ...]
+    def counts(self, rows, top=None):
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        counts = np.bincount(self.codes[positions], minlength=len(self.labels))
+        order = np.lexsort((np.arange(len(counts)), -counts))
+        order = order[counts[order] > 0][:top]
+        return [(self.labels[code], int(counts[code])) for code in order.tolist()]
+
+    # Semua nilai beserta jumlah filmnya di seluruh katalog
+    def values(self, top=None):
+        sizes = np.diff(self.posting_indptr)
+        order = np.lexsort((np.arange(len(sizes)), -sizes))[:top]
+        return [(self.labels[code], int(sizes[code])) for code in order.tolist()]
+
+
+# Semua facet katalog. Filter berbentuk {'genres': ['Horror'], 'cast': [...]}:
+# nilai dalam satu facet digabung OR, antar facet AND.
+class Facets:
+    def __init__(self, indexes):
+        self.indexes = indexes
+
+    @classmethod
+    def from_films(cls, films):
+        return cls({name: FacetIndex.from_values(films[name]) for name in FACET_COLUMNS})
+
+    def append(self, new_films):
+        return Facets({name: index.append(new_films[name]) for name, index in self.indexes.items()})
+
+    def __getitem__(self, name):
+        return self.indexes[name]
+
+    # Bentuk kanonik (hashable) dari filter, untuk key cache; None = tanpa filter
+    @staticmethod
+    def key(filters):
+        if not filters:
+            return None
+        key = []
+        for name, labels in filters.items():
+            if name not in FACET_COLUMNS:
+                raise ValueError(f'Facet tidak dikenal: {name!r} (pilih dari {", ".join(FACET_COLUMNS)})')
+            if isinstance(labels, str):
+                labels = [labels]
+            labels = tuple(sorted({label.strip().lower() for label in labels}))
+            if labels:
+                key.append((name, labels))
+        return tuple(sorted(key)) or None
+
+    # Mask baris yang lolos filter (dari key()); None kalau tidak ada filter
+    def mask(self, key, n_rows=None):
+        if key is None:
+            return None
+        mask = None
+        for name, labels in key:
+            facet_mask = self.indexes[name].mask(labels, n_rows)
+            mask = facet_mask if mask is None else mask & facet_mask
+        return mask
+
+    def counts(self, rows, names=FACET_COLUMNS, top=10):
+        return {name: self.indexes[name].counts(rows, top) for name in names}
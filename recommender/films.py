@@ -0,0 +1,151 @@
+import numpy as np
+
+# Kolom teks yang disimpan sebagai satu blob UTF-8 + offset per baris.
+# Kedua array bisa di-mmap, jadi teks hanya di-decode untuk baris yang diminta.
+class StringColumn:
+    def __init__(self, blob, offsets, nulls=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.nulls = nulls
+
+    # Encode list/Series string (boleh ada NaN) menjadi blob + offsets + nulls
+    @staticmethod
+    def encode(values):
+        encoded, nulls = [], []
+        for value in values:
+            is_null = not isinstance(value, str)
+            nulls.append(is_null)
+            encoded.append(b'' if is_null else value.encode('utf-8'))
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return blob, offsets, np.array(nulls, dtype=bool)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    # Kolom baru = kolom ini + `values` (blob disalin ke memori)
+    def append(self, values):
+        blob, offsets, nulls = self.encode(values)
+        old_nulls = self.nulls if self.nulls is not None else np.zeros(len(self), dtype=bool)
+        return StringColumn(
+            np.concatenate([self.blob, blob]),
+            np.concatenate([self.offsets, offsets[1:] + self.offsets[-1]]),
+            np.concatenate([old_nulls, nulls]),
+        )
+
+    def _get(self, i):
+        if self.nulls is not None and self.nulls[i]:
+            return np.nan
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self._get(key)
+        return np.array([self._get(i) for i in key], dtype=object)
+
+    # Iterasi seluruh kolom: blob diubah ke bytes sekali, bukan per baris
+    def __iter__(self):
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        nulls = self.nulls.tolist() if self.nulls is not None else [False] * len(self)
+        for i, is_null in enumerate(nulls):
+            yield np.nan if is_null else data[offsets[i]:offsets[i + 1]].decode('utf-8')
+
+
+# Tabel metadata film per kolom. Kolom bisa berupa numpy array (dari
+# DataFrame hasil unpickle) atau StringColumn/np.memmap (dari artifact mmap);
+# keduanya mendukung indexing dengan array index.
+class FilmTable:
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls({name: df[name].to_numpy() for name in df.columns})
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    # Tabel baru dengan baris dari DataFrame `df` ditambahkan di akhir;
+    # kolom yang tidak ada di `df` diisi NaN
+    def append(self, df):
+        columns = {}
+        for name, column in self.columns.items():
+            values = df[name] if name in df.columns else [np.nan] * len(df)
+            if isinstance(column, StringColumn):
+                columns[name] = column.append(values)
+            else:
+                columns[name] = np.concatenate([column, np.asarray(values, dtype=column.dtype)])
+        return FilmTable(columns)
+
+    def to_frame(self):
+        return self.take(np.arange(len(self)), list(self.columns))
+
+    # DataFrame kecil berisi baris `indices` saja (index = nomor baris)
+    def take(self, indices, columns):
+        import pandas as pd
+
+        indices = np.asarray(indices, dtype=np.int64)
+        return pd.DataFrame({name: self.columns[name][indices] for name in columns}, index=indices)
+
+
+# Satu baris hasil rekomendasi. Nilai kolom baru dibaca (dan teksnya
+# di-decode) dari FilmTable saat diakses.
+class FilmRecord:
+    __slots__ = ('films', 'row', 'similarity')
+
+    def __init__(self, films, row, similarity):
+        self.films = films
+        self.row = row
+        self.similarity = similarity
+
+    def __getitem__(self, name):
+        if name == 'cosine_similarity':
+            return self.similarity
+        if name == 'row':
+            return self.row
+        return self.films[name][self.row]
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
+# Hasil rekomendasi: index baris + similarity, plus referensi ke FilmTable.
+# Tidak ada kolom yang disalin; hasil[i] memberi FilmRecord, hasil[a:b]
+# memberi potongan (view) dan hasil['kolom'] hanya men-decode baris hasil.
+class Recommendations:
+    def __init__(self, films, indices, similarities, columns):
+        self.films = films
+        self.indices = indices
+        self.similarities = similarities
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return Recommendations(self.films, self.indices[key], self.similarities[key], self.columns)
+        if isinstance(key, str):
+            if key == 'cosine_similarity':
+                return self.similarities
+            if key == 'row':
+                return self.indices
+            return self.films[key][self.indices]
+        return FilmRecord(self.films, int(self.indices[key]), float(self.similarities[key]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    # DataFrame (index = nomor baris), misalnya untuk analisis atau ekspor
+    def to_frame(self):
+        result = self.films.take(self.indices, self.columns)
+        result['cosine_similarity'] = self.similarities
+        return result
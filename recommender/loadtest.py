@@ -0,0 +1,79 @@
+import asyncio
+import random
+import statistics
+import time
+from urllib.parse import quote, urlsplit
+
+
+async def _request(reader, writer, host, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('latin-1'))
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+    length = 0
+    for line in header_lines:
+        name, value = line.split(':', 1)
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    body = await reader.readexactly(length)
+    return int(status_line.split(' ', 2)[1]), body
+
+# Satu koneksi keep-alive yang mengambil path dari antrean sampai habis
+async def _client(url, paths, latencies, errors):
+    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+    try:
+        while paths:
+            path = paths.pop()
+            started = time.perf_counter()
+            try:
+                status, _ = await _request(reader, writer, url.netloc, path)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                errors['connection'] = errors.get('connection', 0) + 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+                continue
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def _load_test(url, paths, concurrency):
+    latencies, errors = [], {}
+    started = time.perf_counter()
+    await asyncio.gather(*[_client(url, paths, latencies, errors) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+        'p90_ms': round(_percentile(latencies, 0.90) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'errors': {str(status): count for status, count in errors.items()},
+    }
+
+# Load test API (python -m recommender serve): `requests` request GET ke
+# `endpoint` dengan judul acak dari `titles`, lewat `concurrency` koneksi
+# keep-alive. Hasil: jumlah request/detik dan latency p50/p90/p99.
+def load_test(base_url, titles, endpoint='recommend', requests=2000, concurrency=16, k=10,
+              warmup=100, seed=0):
+    url = urlsplit(base_url)
+    rng = random.Random(seed)
+    titles = list(titles)
+
+    def paths(n):
+        return [
+            f'/{endpoint}?title={quote(rng.choice(titles))}' + (f'&k={k}' if endpoint == 'recommend' else '')
+            for _ in range(n)
+        ]
+
+    if warmup:
+        asyncio.run(_load_test(url, paths(warmup), min(concurrency, warmup)))
+    return asyncio.run(_load_test(url, paths(requests), concurrency))
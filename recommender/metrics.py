@@ -0,0 +1,189 @@
+import bisect
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Batas bucket histogram (detik)
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+# Timer per tahap pipeline (load artifact, tahap-tahap find_best_match,
+# similarity, ranking, DataFrame hasil, render) dan counter (misalnya tahap
+# mana yang menemukan judul). Saat tidak aktif, timer() mengembalikan objek
+# no-op dan count() langsung kembali, jadi biayanya hampir nol.
+#
+# Agregat disimpan sebagai histogram dan bisa diekspor dalam format teks
+# Prometheus. Trace per query (begin_trace/end_trace) mengumpulkan durasi
+# tiap tahap di thread yang sama; kalau `log_traces` aktif, trace ditulis
+# sebagai satu baris JSON ke logger `recommender.metrics`.
+class Metrics:
+    def __init__(self, enabled=False, log_traces=False):
+        self.enabled = enabled
+        self.log_traces = log_traces
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stages = {}
+        self._counters = {}
+
+    def enable(self, log_traces=None):
+        self.enabled = True
+        if log_traces is not None:
+            self.log_traces = log_traces
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def timer(self, stage):
+        return _Timer(self, stage) if self.enabled else _NULL_TIMER
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(BUCKETS)}
+            entry['count'] += 1
+            entry['sum'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            index = bisect.bisect_left(BUCKETS, seconds)
+            if index < len(BUCKETS):
+                entry['buckets'][index] += 1
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace['stages'][stage] = trace['stages'].get(stage, 0.0) + seconds
+
+    def count(self, name, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace['counters'][name] = labels
+
+    # Mulai trace untuk satu query di thread ini; None kalau metrics tidak aktif.
+    # Trace tidak bertingkat: trace baru menggantikan trace yang belum ditutup
+    # (misalnya karena st.rerun() memotong script di tengah jalan).
+    def begin_trace(self, name, **fields):
+        if not self.enabled:
+            return None
+        trace = {'name': name, **fields, 'stages': {}, 'counters': {}, '_started': time.perf_counter()}
+        self._local.trace = trace
+        return trace
+
+    def end_trace(self, trace):
+        if trace is None:
+            return None
+        if getattr(self._local, 'trace', None) is trace:
+            self._local.trace = None
+        trace['total'] = time.perf_counter() - trace.pop('_started')
+        self.observe(trace['name'], trace['total'])
+        if self.log_traces:
+            logger.info(json.dumps(trace, ensure_ascii=False, default=str))
+        return trace
+
+    # Context manager untuk begin_trace/end_trace
+    def trace(self, name, **fields):
+        return _Trace(self, name, fields)
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': entry['count'],
+                    'mean_ms': entry['sum'] / entry['count'] * 1000,
+                    'max_ms': entry['max'] * 1000,
+                    'total_s': entry['sum'],
+                }
+                for stage, entry in self._stages.items()
+            }
+            counters = {}
+            for (name, labels), value in self._counters.items():
+                counters.setdefault(name, {})[','.join(f'{k}={v}' for k, v in labels)] = value
+        return {'stages': stages, 'counters': counters}
+
+    # Ekspor format teks Prometheus (exposition format 0.0.4). `labels`
+    # ditambahkan ke setiap series, mis. {'pid': ...} untuk membedakan proses.
+    def prometheus(self, prefix='recommender', labels=None):
+        common = ''.join(f'{k}="{_escape(v)}",' for k, v in sorted((labels or {}).items()))
+        with self._lock:
+            stages = {stage: dict(entry, buckets=list(entry['buckets'])) for stage, entry in self._stages.items()}
+            counters = dict(self._counters)
+
+        lines = [
+            f'# HELP {prefix}_stage_seconds Durasi per tahap pipeline',
+            f'# TYPE {prefix}_stage_seconds histogram',
+        ]
+        for stage, entry in sorted(stages.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, entry['buckets']):
+                cumulative += n
+                lines.append(f'{prefix}_stage_seconds_bucket{{{common}stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{{common}stage="{stage}",le="+Inf"}} {entry["count"]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{{common}stage="{stage}"}} {entry["sum"]:.9f}')
+            lines.append(f'{prefix}_stage_seconds_count{{{common}stage="{stage}"}} {entry["count"]}')
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            for (counter, counter_labels), value in sorted(counters.items()):
+                if counter == name:
+                    label_text = common + ','.join(f'{k}="{_escape(v)}"' for k, v in counter_labels)
+                    label_text = f'{{{label_text.rstrip(",")}}}' if label_text else ''
+                    lines.append(f'{prefix}_{name}_total{label_text} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class _Trace:
+    def __init__(self, metrics, name, fields):
+        self.metrics = metrics
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.trace = self.metrics.begin_trace(self.name, **self.fields)
+        return self.trace
+
+    def __exit__(self, *exc):
+        self.metrics.end_trace(self.trace)
+        return False
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Registry bersama untuk seluruh proses (nonaktif secara default)
+metrics = Metrics()
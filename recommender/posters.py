@@ -0,0 +1,201 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .artifacts import ARTIFACT_DIR
+
+POSTER_CACHE_DIR = os.path.join(ARTIFACT_DIR, '.poster_cache')
+# Jenis kegagalan download: permanen (4xx, bukan gambar) dicatat selama
+# negative_ttl, sementara (timeout, koneksi, 5xx, 408/429) hanya transient_ttl
+PERMANENT = 'permanent'
+TRANSIENT = 'transient'
+
+# Tulis file secara atomik (tmp lalu rename) supaya proses/thread lain
+# tidak pernah membaca file yang setengah jadi
+def _write_atomic(path, data):
+    tmp = f'{path}.{os.getpid()}.{time.monotonic_ns()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# Cache poster lokal. Poster diunduh lewat satu requests.Session (connection
+# pool), diperkecil jadi thumbnail, lalu disimpan di disk berdasarkan hash
+# isinya (content-addressed, poster identik hanya disimpan sekali).
+#
+#   blobs/<sha256>.jpg   thumbnail
+#   urls/<sha1(url)>     isi: sha256 blob, "!<timestamp>" untuk URL mati,
+#                        atau "?<timestamp>" untuk gagal sementara
+#
+# URL yang pasti mati (4xx, isi bukan gambar) dicatat sebagai hasil negatif
+# selama `negative_ttl` detik. Gangguan jaringan dan error 5xx hanya dicatat
+# `transient_ttl` detik, supaya gangguan singkat tidak menandai poster
+# sebagai mati seharian (tapi juga tidak dicoba ulang di setiap render).
+# Kalau total ukuran blob melebihi `max_bytes`, blob yang paling lama tidak
+# dipakai dihapus lebih dulu.
+class PosterCache:
+    def __init__(self, cache_dir=POSTER_CACHE_DIR, max_bytes=200 * 1024 * 1024,
+                 thumb_size=(342, 513), negative_ttl=24 * 3600, transient_ttl=60, timeout=5,
+                 max_workers=8, session=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self.negative_ttl = negative_ttl
+        self.transient_ttl = transient_ttl
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._session = session
+        self._blob_dir = os.path.join(cache_dir, 'blobs')
+        self._url_dir = os.path.join(cache_dir, 'urls')
+        os.makedirs(self._blob_dir, exist_ok=True)
+        os.makedirs(self._url_dir, exist_ok=True)
+        # Byte blob baru sejak evict terakhir; evict (scan seluruh folder)
+        # hanya perlu kalau ada yang bertambah
+        self._added = 0
+        self._added_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+
+    def _url_path(self, url):
+        return os.path.join(self._url_dir, hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def _blob_path(self, digest):
+        return os.path.join(self._blob_dir, digest + '.jpg')
+
+    # Lihat cache saja tanpa download. Hasil: path thumbnail, False kalau URL
+    # tercatat mati (dan belum kedaluwarsa), None kalau belum pernah di-cache.
+    def lookup(self, url):
+        try:
+            with open(self._url_path(url)) as f:
+                entry = f.read().strip()
+        except OSError:
+            return None
+
+        if entry[:1] in ('!', '?'):
+            ttl = self.negative_ttl if entry[0] == '!' else self.transient_ttl
+            if time.time() - float(entry[1:]) < ttl:
+                return False
+            return None
+
+        path = self._blob_path(entry)
+        try:
+            os.utime(path)  # tandai baru dipakai (untuk eviction LRU)
+        except OSError:
+            return None  # blob sudah di-evict
+        return path
+
+    # Thumbnail JPEG; tanpa Pillow gambar asli disimpan apa adanya
+    def _thumbnail(self, content):
+        try:
+            from PIL import Image
+        except ImportError:
+            return content
+
+        with Image.open(io.BytesIO(content)) as image:
+            image = image.convert('RGB')
+            image.thumbnail(self.thumb_size)
+            out = io.BytesIO()
+            image.save(out, format='JPEG', quality=85, optimize=True)
+        return out.getvalue()
+
+    # Hasil: (thumbnail, None) atau (None, PERMANENT/TRANSIENT)
+    def _download(self, url):
+        import requests
+
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return None, TRANSIENT
+        status = response.status_code
+        if status >= 500 or status in (408, 429):
+            return None, TRANSIENT
+        if status >= 400:
+            return None, PERMANENT
+        try:
+            return self._thumbnail(response.content), None
+        except Exception:  # isi bukan gambar yang bisa dibaca
+            return None, PERMANENT
+
+    # Path thumbnail untuk satu URL (download kalau belum ada), None kalau gagal
+    def get(self, url):
+        if not isinstance(url, str) or not url:
+            return None
+
+        cached = self.lookup(url)
+        if cached is not None:
+            return cached or None
+
+        thumbnail, failure = self._download(url)
+        if thumbnail is None:
+            marker = '!' if failure == PERMANENT else '?'
+            _write_atomic(self._url_path(url), f'{marker}{time.time()}'.encode())
+            return None
+
+        digest = hashlib.sha256(thumbnail).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            _write_atomic(path, thumbnail)
+            with self._added_lock:
+                self._added += len(thumbnail)
+        _write_atomic(self._url_path(url), digest.encode())
+        return path
+
+    # Ambil banyak poster secara paralel: {url: path atau None}
+    def get_many(self, urls):
+        urls = list(dict.fromkeys(u for u in urls if isinstance(u, str) and u))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            paths = dict(zip(urls, pool.map(self.get, urls)))
+        with self._added_lock:
+            added, self._added = self._added, 0
+        if added:
+            self.evict()
+        return paths
+
+    # Hapus blob yang paling lama tidak dipakai sampai total <= max_bytes
+    def evict(self):
+        blobs = []
+        total = 0
+        with os.scandir(self._blob_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.jpg'):
+                    stat = entry.stat()
+                    blobs.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    # Isi cache untuk seluruh katalog (dipakai oleh perintah prefetch-posters)
+    def prefetch(self, urls, chunk_size=256, progress=None):
+        urls = [u for u in urls if isinstance(u, str) and u]
+        ok = failed = 0
+        for start in range(0, len(urls), chunk_size):
+            paths = self.get_many(urls[start:start + chunk_size])
+            ok += sum(path is not None for path in paths.values())
+            failed += sum(path is None for path in paths.values())
+            if progress:
+                progress(min(start + chunk_size, len(urls)), len(urls))
+        return ok, failed
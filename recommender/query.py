@@ -0,0 +1,54 @@
+import numpy as np
+
+from .artifacts import freeze
+
+
+# Vektor TF-IDF untuk query teks bebas ("space marines, james cameron").
+# Hasilnya sama dengan tfidf.transform([text]), tapi tanpa overhead sklearn
+# per panggilan: analyzer, vocabulary dan idf diambil sekali dari vectorizer,
+# lalu satu query cukup tokenisasi + lookup dict (~puluhan us vs ~1 ms).
+class QueryEncoder:
+    def __init__(self, tfidf):
+        self.analyzer = tfidf.build_analyzer()
+        self.vocabulary = tfidf.vocabulary_
+        self.n_features = len(self.vocabulary)
+        self.idf = tfidf.idf_ if getattr(tfidf, 'use_idf', False) else None
+        self.binary = getattr(tfidf, 'binary', False)
+        self.sublinear_tf = getattr(tfidf, 'sublinear_tf', False)
+        self.norm = getattr(tfidf, 'norm', None)
+
+    # (indices, values, terms): kolom vocabulary terurut, bobot TF-IDF-nya,
+    # dan term query yang dikenali (urut kemunculan, tanpa duplikat)
+    def encode(self, text):
+        tokens = [token for token in self.analyzer(text) if token in self.vocabulary]
+        counts = {}
+        for token in tokens:
+            column = self.vocabulary[token]
+            counts[column] = counts.get(column, 0) + 1
+        indices = np.array(sorted(counts), dtype=np.int64)
+        values = np.array([counts[i] for i in indices.tolist()], dtype=np.float64)
+
+        if self.binary:
+            values[:] = 1.0
+        elif self.sublinear_tf:
+            values = np.log(values) + 1
+        if self.idf is not None:
+            values *= self.idf[indices]
+        # Dijumlah berurutan (accumulate) seperti normalize() sklearn, jadi
+        # hasilnya identik sampai bit terakhir
+        if self.norm == 'l2' and len(values):
+            norm = np.sqrt(np.add.accumulate(values * values)[-1])
+        elif self.norm == 'l1' and len(values):
+            norm = np.add.accumulate(np.abs(values))[-1]
+        else:
+            norm = 0.0
+        if norm > 0:
+            values /= norm
+        freeze(indices, values)
+        return indices, values, list(dict.fromkeys(tokens))
+
+    # Vektor dense ukuran vocabulary, untuk mat-vec dengan tfidf_matrix
+    def dense(self, indices, values):
+        vector = np.zeros(self.n_features, dtype=np.float64)
+        vector[indices] = values
+        return vector
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Urutkan kandidat berdasarkan skor menurun dan ambil k teratas.
+# argpartition memilih k terbaik tanpa mengurutkan semua kandidat; karena
+# pilihannya di antara skor yang sama dengan skor ke-k bebas, semua kandidat
+# dengan skor itu ikut diurutkan dulu, baru dipotong. Jadi film dengan skor
+# sama selalu diurutkan berdasarkan index, dan hasil top-k = awalan hasil penuh.
+def rank_candidates(candidates, values, k=None):
+    if k is not None and k < len(candidates):
+        if k <= 0:
+            return candidates[:0], values[:0]
+        kth = values[np.argpartition(-values, k - 1)[k - 1]]
+        part = np.flatnonzero(values >= kth)
+        candidates, values = candidates[part], values[part]
+
+    order = np.lexsort((candidates, -values))[:k]
+    return candidates[order], values[order]
+
+# Ambil index top-k dengan similarity >= min_similarity, urut menurun
+def top_k(scores, k=None, min_similarity=0.09, exclude=None):
+    candidates = np.flatnonzero(scores >= min_similarity)
+    if exclude is not None:
+        candidates = candidates[~np.isin(candidates, exclude)]
+    return rank_candidates(candidates, scores[candidates], k)[0]
+
+# Maximal marginal relevance: pilih k dari kandidat (urut menurun) secara
+# greedy, skor = lambda * relevance - (1 - lambda) * similarity maksimum ke
+# kandidat yang sudah terpilih. `pairwise` = similarity antar kandidat
+# (M x M, hanya kandidat, bukan N x N). lambda 1 = urutan asli.
+def mmr(relevance, pairwise, k, lambda_=0.7):
+    n = len(relevance)
+    k = n if k is None else min(k, n)
+    selected = []
+    if k <= 0:
+        return np.array(selected, dtype=np.int64)
+    redundancy = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    for _ in range(k):
+        scores = np.where(available, lambda_ * relevance - (1 - lambda_) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, pairwise[best], out=redundancy)
+    return np.array(selected, dtype=np.int64)
@@ -0,0 +1,424 @@
+import asyncio
+import gc
+import json
+import logging
+import math
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from .facets import FACET_COLUMNS
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+MAX_K = 500
+MAX_BATCH = 1000
+KEEPALIVE_TIMEOUT = 15
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# Hasil rekomendasi -> list dict yang bisa di-JSON-kan (NaN jadi null)
+def result_records(result):
+    if result is None:
+        return []
+    records = []
+    for film in result:
+        record = {'row': film.row}
+        for name in result.columns:
+            value = film[name]
+            record[name] = None if value != value else value  # NaN != NaN
+        record['cosine_similarity'] = film.similarity
+        records.append(record)
+    return records
+
+
+# API HTTP JSON di atas RecommenderEngine, tanpa framework: asyncio murni
+# dengan parser HTTP/1.1 minimal (keep-alive, Content-Length).
+# Event loop hanya mengurus I/O; pencocokan judul dan scoring (CPU-bound)
+# dijalankan di thread pool berukuran tetap. Kalau antrean sudah
+# `max_pending`, request langsung dijawab 503 supaya latency tidak menumpuk.
+#
+#   GET  /health
+#   GET  /metrics           format teks Prometheus, per proses worker (label pid)
+#   GET  /match?title=...
+#   GET  /recommend?title=...&k=10&min_similarity=0.09
+#   GET  /search?q=...&k=10&min_similarity=0.09   deskripsi bebas
+#   POST /recommend/batch   {"titles": [...], "k": 10, "min_similarity": 0.09, "filters": {...}}
+#
+# /recommend dan /search menerima filter genres=, director=, cast= (beberapa
+# nilai dipisah koma), facets=1 untuk jumlah film per genre/director/cast
+# di hasil, dan mmr_lambda= (0..1, opsional mmr_candidates=) untuk hasil
+# yang lebih beragam.
+class RecommenderServer:
+    def __init__(self, engine, max_workers=4, max_pending=64):
+        self.engine = engine
+        self.max_pending = max_pending
+        self.pending = 0
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='recommender')
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/metrics'): self.prometheus,
+            ('GET', '/match'): self.match,
+            ('GET', '/recommend'): self.recommend,
+            ('GET', '/search'): self.search,
+            ('POST', '/recommend/batch'): self.recommend_batch,
+        }
+
+    # Jalankan fungsi blocking di thread pool (dengan batas antrean)
+    async def run_blocking(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPError(503, 'Server sedang sibuk, coba lagi')
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self._traced, fn, *args)
+        finally:
+            self.pending -= 1
+
+    # Trace per request dibuat di thread pool, tempat timer tiap tahap berjalan
+    @staticmethod
+    def _traced(fn, *args):
+        with metrics.trace('api' + fn.__name__):
+            return fn(*args)
+
+    async def health(self, params, body):
+        engine = self.engine
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'loaded': engine.loaded,
+            'films': len(engine.films) if engine.loaded else None,
+            'search': engine.search,
+            'pending': self.pending,
+        }
+
+    async def prometheus(self, params, body):
+        return metrics.prometheus(labels={'pid': os.getpid()})
+
+    async def match(self, params, body):
+        return await self.run_blocking(self._match, _required(params, 'title'))
+
+    async def recommend(self, params, body):
+        return await self.run_blocking(
+            self._recommend,
+            _required(params, 'title'),
+            _int_param(params, 'k', 10, 0, MAX_K),
+            _float_param(params, 'min_similarity', 0.09),
+            _filter_params(params),
+            params.get('facets') == '1',
+            _mmr_params(params),
+        )
+
+    async def search(self, params, body):
+        return await self.run_blocking(
+            self._search,
+            _required(params, 'q'),
+            _int_param(params, 'k', 10, 0, MAX_K),
+            _float_param(params, 'min_similarity', 0.09),
+            _filter_params(params),
+            params.get('facets') == '1',
+            _mmr_params(params),
+        )
+
+    async def recommend_batch(self, params, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, 'Body harus JSON') from None
+        titles = payload.get('titles') if isinstance(payload, dict) else None
+        if not isinstance(titles, list) or not all(isinstance(t, str) for t in titles):
+            raise HTTPError(400, "'titles' harus berupa list judul")
+        if len(titles) > MAX_BATCH:
+            raise HTTPError(413, f'Maksimal {MAX_BATCH} judul per batch')
+        filters = payload.get('filters') or {}
+        if not isinstance(filters, dict) or not all(
+            name in FACET_COLUMNS
+            and (isinstance(values, str) or isinstance(values, list) and all(isinstance(v, str) for v in values))
+            for name, values in filters.items()
+        ):
+            raise HTTPError(400, f"'filters' harus berupa object dengan key {', '.join(FACET_COLUMNS)} "
+                                 "dan nilai string atau list string")
+        return await self.run_blocking(
+            self._recommend_batch,
+            titles,
+            _int_param(payload, 'k', 10, 0, MAX_K),
+            _float_param(payload, 'min_similarity', 0.09),
+            filters,
+        )
+
+    def _match(self, title):
+        engine = self.engine
+        idx = engine.find_best_match(title)
+        return {
+            'query': title,
+            'row': idx,
+            'title': engine.title_index.titles[idx] if idx is not None else None,
+        }
+
+    def _recommend(self, title, k, min_similarity, filters, facets, mmr):
+        engine = self.engine
+        result, original_title = engine.recommend_film(title, k=k, min_similarity=min_similarity, filters=filters,
+                                                       **mmr)
+        response = {'query': title, 'title': original_title, 'results': result_records(result)}
+        if facets:
+            response['facets'] = engine.facet_counts(result)
+        return response
+
+    def _search(self, text, k, min_similarity, filters, facets, mmr):
+        engine = self.engine
+        result, terms = engine.recommend_text(text, k=k, min_similarity=min_similarity, filters=filters, **mmr)
+        response = {'query': text, 'terms': terms, 'results': result_records(result)}
+        if facets:
+            response['facets'] = engine.facet_counts(result)
+        return response
+
+    def _recommend_batch(self, titles, k, min_similarity, filters):
+        engine = self.engine
+        results = []
+        for seed, idx, neighbours, similarities in engine.recommend_batch(titles, k, min_similarity,
+                                                                          filters=filters):
+            results.append({
+                'query': seed,
+                'title': engine.title_index.titles[idx] if idx is not None else None,
+                'results': result_records(engine.build_result(neighbours, similarities)),
+            })
+        return {'results': results}
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        try:
+            if handler is None:
+                if any(path == url.path for _, path in self.routes):
+                    raise HTTPError(405, f'Method {method} tidak didukung')
+                raise HTTPError(404, f'Endpoint {url.path} tidak ada')
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            return 200, await handler(params, body)
+        except HTTPError as e:
+            return e.status, {'error': e.message}
+        except Exception:
+            logger.exception('Gagal memproses %s %s', method, target)
+            return 500, {'error': 'Terjadi kesalahan di server'}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await _respond(writer, 431, {'error': 'Header terlalu besar'}, False)
+                    break
+
+                try:
+                    request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+                    method, target, version = request_line.split(' ', 2)
+                    headers = {}
+                    for line in header_lines:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await _respond(writer, 400, {'error': 'Request tidak valid'}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await _respond(writer, 413, {'error': 'Body terlalu besar'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                status, payload = await self.dispatch(method, target, body)
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, sock):
+        server = await asyncio.start_server(self.handle, sock=sock, limit=MAX_HEADER_BYTES)
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+        async with server:
+            await stop
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Payload dict dikirim sebagai JSON, string sebagai teks biasa (/metrics)
+async def _respond(writer, status, payload, keep_alive):
+    if isinstance(payload, str):
+        body = payload.encode('utf-8')
+        content_type = 'text/plain; version=0.0.4; charset=utf-8'
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        content_type = 'application/json; charset=utf-8'
+    head = (
+        f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'
+        f'Content-Type: {content_type}\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        '\r\n'
+    )
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+def _required(params, name):
+    value = params.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"Parameter '{name}' wajib diisi")
+    return value
+
+def _int_param(params, name, default, low, high):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"Parameter '{name}' harus bilangan bulat") from None
+    if not low <= value <= high:
+        raise HTTPError(400, f"Parameter '{name}' harus di antara {low} dan {high}")
+    return value
+
+# Filter facet dari query string: genres=Horror,Comedy&cast=Tom Hanks
+def _filter_params(params):
+    return {
+        name: [value for value in params[name].split(',') if value.strip()]
+        for name in FACET_COLUMNS if name in params
+    }
+
+def _mmr_params(params):
+    if 'mmr_lambda' not in params:
+        return {}
+    mmr_lambda = _float_param(params, 'mmr_lambda', None)
+    if not 0 <= mmr_lambda <= 1:
+        raise HTTPError(400, "Parameter 'mmr_lambda' harus di antara 0 dan 1")
+    return {
+        'mmr_lambda': mmr_lambda,
+        'mmr_candidates': _int_param(params, 'mmr_candidates', 0, 0, MAX_K) or None,
+    }
+
+def _float_param(params, name, default):
+    try:
+        value = float(params.get(name, default))
+    except (TypeError, ValueError):
+        value = None
+    # float() juga menerima 'nan'/'inf', yang lolos semua perbandingan batas
+    if value is None or not math.isfinite(value):
+        raise HTTPError(400, f"Parameter '{name}' harus angka")
+    return value
+
+
+def _run_worker(sock, engine, max_workers, max_pending, log_traces):
+    metrics.enable(log_traces)
+    server = RecommenderServer(engine, max_workers=max_workers, max_pending=max_pending)
+    asyncio.run(server.serve(sock))
+
+def _prepare_engine(engine_factory, warmup):
+    engine = engine_factory()
+    if warmup:
+        return engine, engine.warmup(warmup)
+    engine.load()
+    return engine, None
+
+# Proses worker hasil fork: kalau `engine` None (tanpa preload), engine
+# dibuat dan di-warmup sendiri oleh worker
+def _worker_main(sock, engine, engine_factory, warmup, max_workers, max_pending, log_traces):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    status = 0
+    try:
+        if engine is None:
+            engine, _ = _prepare_engine(engine_factory, warmup)
+        _run_worker(sock, engine, max_workers, max_pending, log_traces)
+    except BaseException:
+        logger.exception('Worker %d berhenti karena error', os.getpid())
+        status = 1
+    os._exit(status)
+
+# Jalankan API di host:port. Dengan workers > 1, socket dibuat sekali lalu
+# proses di-fork; semua worker menerima koneksi dari socket yang sama.
+#
+# Dengan preload (default), artifact di-load dan engine di-warmup sekali di
+# proses induk sebelum socket dibuka dan sebelum fork, jadi worker langsung
+# siap dan berbagi memori engine secara copy-on-write: array mmap lewat page
+# cache, sisanya (index judul, facet, encoder, cache hasil warmup) lewat
+# page induk. gc.freeze() memindahkan objek induk ke generasi permanen
+# supaya garbage collector di worker tidak menulis ke page-page itu.
+# Worker yang mati diganti dengan fork baru dari induk (tanpa load ulang).
+#
+# Metrics tidak digabung antar worker: /metrics menjawab dari worker yang
+# kebetulan menerima koneksi, dengan label pid. Jumlahkan di Prometheus,
+# mis. sum without (pid) (rate(recommender_stage_seconds_count[5m])).
+def serve(engine_factory, host='127.0.0.1', port=8000, workers=1, max_workers=4, max_pending=64,
+          log_traces=False, preload=True, warmup=200, progress=print):
+    engine = None
+    if preload or workers <= 1:
+        engine, report = _prepare_engine(engine_factory, warmup)
+        if report is not None:
+            progress(f"🔥 Warmup: {report['queries']} query dalam {report['seconds']:.1f} s")
+
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.setblocking(False)
+    progress(f'🚀 API rekomendasi di http://{host}:{port} ({workers} worker)')
+
+    if workers <= 1:
+        _run_worker(sock, engine, max_workers, max_pending, log_traces)
+        return
+
+    if not hasattr(os, 'fork'):
+        raise RuntimeError('workers > 1 butuh os.fork (Linux/macOS)')
+    if engine is not None:
+        gc.collect()
+        gc.freeze()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            _worker_main(sock, engine, engine_factory, warmup, max_workers, max_pending, log_traces)
+        children[pid] = time.monotonic()
+
+    children = {}
+    stopping = False
+    for _ in range(workers):
+        spawn()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while children:
+        pid, status = os.wait()
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        logger.warning('Worker %d berhenti (status %d), diganti', pid, os.waitstatus_to_exitcode(status))
+        # Worker yang langsung mati (mis. error saat start) tidak di-fork ulang terus-menerus
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        if not stopping:
+            spawn()
+    sock.close()
@@ -0,0 +1,63 @@
+import random
+import re
+
+import numpy as np
+
+# Normalisasi judul: tanda baca jadi spasi, spasi ganda dirapikan
+_PUNCT_RE = re.compile(r'[-_\.\,\:\;]')
+_SPACE_RE = re.compile(r'\s+')
+
+def normalize_string(s):
+    normalized = _PUNCT_RE.sub(' ', s.lower())
+    normalized = _SPACE_RE.sub(' ', normalized).strip()
+    return normalized
+
+# N-gram karakter (panjang 2 dan 3) dari sebuah string
+def char_ngrams(s, n):
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+# Kolom hitungan karakter untuk prefilter fuzzy, karakter lain digabung
+# ke satu kolom "lainnya" (tetap batas atas yang aman)
+_FUZZY_ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789 '
+_FUZZY_COLUMN = {c: i for i, c in enumerate(_FUZZY_ALPHABET)}
+
+def char_counts(s):
+    counts = np.zeros(len(_FUZZY_ALPHABET) + 1, dtype=np.uint16)
+    for c in s:
+        counts[_FUZZY_COLUMN.get(c, len(_FUZZY_ALPHABET))] += 1
+    return counts
+
+# Contoh query per kategori dari daftar judul (untuk benchmark dan warmup):
+# judul persis, potongan satu kata (substring), dua kata berurutan, dan
+# typo satu huruf. Typo diambil
+# dari judul satu kata karena hanya input satu kata yang sampai ke tahap
+# fuzzy (input multi-kata tanpa partial match langsung None).
+def make_queries(titles, n_queries=300, seed=0):
+    rng = random.Random(seed)
+    titles = [t for t in titles if isinstance(t, str) and len(t) >= 4]
+    multi_word = [t for t in titles if len(t.split()) >= 3]
+    single_word = [t for t in titles if len(t.split()) == 1 and len(t) >= 5]
+
+    def sample(pool):
+        return rng.sample(pool, min(n_queries, len(pool)))
+
+    def substring(title):
+        word = rng.choice([w for w in title.split() if len(w) >= 4] or [title])
+        start = rng.randrange(0, max(1, len(word) - 3))
+        return word[start:start + rng.randint(4, 7)]
+
+    def two_words(title):
+        words = title.split()
+        start = rng.randrange(0, len(words) - 1)
+        return ' '.join(words[start:start + 2])
+
+    def typo(title):
+        i = rng.randrange(len(title))
+        return title[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + title[i + 1:]
+
+    return {
+        'exact': [t.lower() for t in sample(titles)],
+        'substring': [substring(t).lower() for t in sample(titles)],
+        'multi_word': [two_words(t).lower() for t in sample(multi_word)],
+        'typo': [typo(t).lower() for t in sample(single_word)],
+    }
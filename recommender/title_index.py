@@ -0,0 +1,163 @@
+import heapq
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from .metrics import metrics
+from .text import char_counts, char_ngrams, normalize_string
+
+# Index judul dibangun sekali saat load, bukan setiap kali mencari
+class TitleIndex:
+    def __init__(self, titles=()):
+        self.titles = []
+        self.normalized = []
+        self.word_count = []
+        self.title_length = []
+        self.exact = {}
+        self.grams = {}
+        self.fuzzy_titles = []
+        self.fuzzy_lengths = np.zeros(0, dtype=np.int64)
+        self.fuzzy_counts = np.zeros((0, len(char_counts(''))), dtype=np.uint16)
+        self.extend(titles)
+
+    # Tambah judul (saat build index dan saat katalog di-append).
+    # Urutannya aman untuk pembaca di thread lain: list per baris diisi dulu,
+    # baru dict/posting list yang menunjuk ke baris itu, dan array fuzzy
+    # (read-only) diganti paling akhir.
+    def extend(self, titles):
+        new_fuzzy = []
+        for i, title in enumerate(titles, len(self.titles)):
+            t = normalize_string(title)
+            self.titles.append(title)
+            self.normalized.append(t)
+            self.word_count.append(len(t.split()))
+            self.title_length.append(len(title))
+            
+            if t not in self.exact:
+                self.exact[t] = i
+                new_fuzzy.append(t)
+            # Inverted index: n-gram -> id judul yang mengandungnya
+            for gram in char_ngrams(t, 2) | char_ngrams(t, 3):
+                self.grams.setdefault(gram, set()).add(i)
+        
+        if new_fuzzy:
+            self.fuzzy_titles.extend(new_fuzzy)
+            fuzzy_lengths = np.concatenate([
+                self.fuzzy_lengths, np.array([len(t) for t in new_fuzzy], dtype=np.int64)
+            ])
+            fuzzy_counts = np.vstack([self.fuzzy_counts, [char_counts(t) for t in new_fuzzy]])
+            fuzzy_lengths.flags.writeable = False
+            fuzzy_counts.flags.writeable = False
+            self.fuzzy_lengths, self.fuzzy_counts = fuzzy_lengths, fuzzy_counts
+
+    def __len__(self):
+        return len(self.titles)
+
+    # Id judul yang mengandung `text` sebagai substring, urut sesuai df_all.
+    # Kandidat diambil dari irisan posting list n-gram, lalu dicek ulang.
+    def substring_candidates(self, text):
+        n = 3 if len(text) >= 3 else 2
+        postings = []
+        for gram in char_ngrams(text, n):
+            posting = self.grams.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return sorted(i for i in candidates if text in self.normalized[i])
+
+    # Pengganti difflib.get_close_matches dengan hasil yang sama.
+    # Batas atas real_quick_ratio (panjang) dan quick_ratio (hitungan karakter)
+    # dihitung sekaligus dengan numpy, jadi SequenceMatcher hanya dijalankan
+    # untuk judul yang masih mungkin lolos cutoff.
+    def close_matches(self, word, n=5, cutoff=0.7):
+        # counts dibaca dulu: extend() mengganti lengths sebelum counts
+        fuzzy_counts = self.fuzzy_counts
+        fuzzy_lengths = self.fuzzy_lengths[:len(fuzzy_counts)]
+        total = fuzzy_lengths + len(word)
+
+        rows = np.flatnonzero(2.0 * np.minimum(fuzzy_lengths, len(word)) / total >= cutoff)
+        common = np.minimum(fuzzy_counts[rows], char_counts(word)).sum(axis=1)
+        rows = rows[2.0 * common / total[rows] >= cutoff]
+
+        result = []
+        s = SequenceMatcher()
+        s.set_seq2(word)
+        for i in rows:
+            s.set_seq1(self.fuzzy_titles[i])
+            score = s.ratio()
+            if score >= cutoff:
+                result.append((score, self.fuzzy_titles[i]))
+
+        return [x for score, x in heapq.nlargest(n, result)]
+
+    # Fungsi untuk mencari film yang cocok; hasilnya index baris df_all
+    # (None kalau tidak ketemu). Durasi tiap tahap dan tahap yang menemukan
+    # judul dicatat ke metrics (kalau aktif).
+    def find_best_match(self, user_input):
+        normalized_input = normalize_string(user_input.strip())
+        
+        # Tolak input yang terlalu pendek
+        if len(normalized_input) < 2:
+            metrics.count('match_stage', stage='too_short')
+            return None
+
+        normalized_titles = self.normalized
+        
+        # 1. Exact match
+        with metrics.timer('match_exact'):
+            exact_idx = self.exact.get(normalized_input)
+        if exact_idx is not None:
+            metrics.count('match_stage', stage='exact')
+            return exact_idx
+        
+        # 2. Partial match
+        with metrics.timer('match_partial'):
+            partial_matches = self.substring_candidates(normalized_input)
+       
+            # Tambahan validasi penting
+            input_words = normalized_input.split()
+            if len(input_words) >= 2 and not partial_matches:
+                metrics.count('match_stage', stage='none')
+                return None
+            
+            if partial_matches:
+                # Urutan: diawali input, jumlah kata paling sedikit, judul paling pendek
+                best = min(partial_matches, key=lambda i: (
+                    not normalized_titles[i].startswith(normalized_input),
+                    self.word_count[i],
+                    self.title_length[i],
+                ))
+                metrics.count('match_stage', stage='partial')
+                return best
+        
+        # 3. Keyword match
+        with metrics.timer('match_keyword'):
+            if len(input_words) > 1:
+                for word in input_words:
+                    if len(word) > 2:
+                        word_matches = self.substring_candidates(word)
+                        if word_matches:
+                            word_score = {
+                                i: sum(input_word in normalized_titles[i] for input_word in input_words)
+                                for i in word_matches
+                            }
+                            
+                            if word_score[word_matches[0]] < 2:
+                                continue  # skip kalau cuma cocok 1 kata
+
+                            best = min(word_matches, key=lambda i: (-word_score[i], self.title_length[i]))
+                            metrics.count('match_stage', stage='keyword')
+                            return best
+        
+        # 4. Approximate match
+        with metrics.timer('match_fuzzy'):
+            matches = self.close_matches(normalized_input, n=5, cutoff=0.7)
+        
+        if matches:
+            metrics.count('match_stage', stage='fuzzy')
+            return self.exact[matches[0]]
+        
+        metrics.count('match_stage', stage='none')
+        return None
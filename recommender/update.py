@@ -0,0 +1,37 @@
+import numpy as np
+
+# Batas kapan refit TF-IDF penuh disarankan
+IDF_DRIFT_THRESHOLD = 0.05
+OOV_RATE_THRESHOLD = 0.2
+
+# Seberapa jauh IDF katalog sekarang bergeser dari IDF vectorizer yang
+# dipakai: selisih relatif, dibobot document frequency tiap term.
+# 0 berarti vectorizer persis sesuai katalog (misalnya tepat setelah build).
+def idf_drift(vectorizer, tfidf_matrix):
+    fitted = vectorizer.idf_
+    n_documents = tfidf_matrix.shape[0]
+    df = np.bincount(tfidf_matrix.indices, minlength=len(fitted))
+    current = np.log((1 + n_documents) / (1 + df)) + 1
+    weight = np.sum(df * fitted)
+    return float(np.sum(df * np.abs(current - fitted)) / weight) if weight else 0.0
+
+# Porsi token di dokumen baru yang tidak ada di vocabulary (diabaikan oleh
+# transform, jadi tidak ikut menentukan similarity)
+def oov_rate(vectorizer, docs):
+    analyzer = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    total = oov = 0
+    for doc in docs:
+        tokens = analyzer(doc)
+        total += len(tokens)
+        oov += sum(token not in vocabulary for token in tokens)
+    return oov / total if total else 0.0
+
+def staleness_report(vectorizer, tfidf_matrix, new_docs):
+    drift = idf_drift(vectorizer, tfidf_matrix)
+    oov = oov_rate(vectorizer, new_docs)
+    return {
+        'idf_drift': round(drift, 6),
+        'oov_rate': round(oov, 6),
+        'needs_refit': drift > IDF_DRIFT_THRESHOLD or oov > OOV_RATE_THRESHOLD,
+    }
@@ -0,0 +1,162 @@
+import io
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip('requests')
+Image = pytest.importorskip('PIL.Image')
+
+from recommender import posters
+from recommender.posters import PosterCache
+
+
+def _png(size, color):
+    out = io.BytesIO()
+    Image.new('RGB', size, color).save(out, format='PNG')
+    return out.getvalue()
+
+
+# Server HTTP lokal pengganti TMDB; jumlah request per path dicatat
+@pytest.fixture
+def server():
+    red = _png((1000, 1500), 'red')
+    routes = {
+        '/red.png': (200, red),
+        '/red-copy.png': (200, red),  # isi sama, URL beda
+        '/blue.png': (200, _png((600, 900), 'blue')),
+        '/green.png': (200, _png((600, 900), 'green')),
+        '/not-image': (200, b'<html>bukan gambar</html>'),
+        '/missing': (404, b'not found'),
+        '/error': (503, b'down'),
+    }
+    hits = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            status, body = routes.get(self.path, (404, b''))
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{httpd.server_address[1]}'
+    yield base, hits
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with requests.Session() as session:
+        yield PosterCache(str(tmp_path), session=session, max_workers=4)
+
+
+def _blobs(cache):
+    return sorted(os.listdir(os.path.join(cache.cache_dir, 'blobs')))
+
+def _later(monkeypatch, seconds):
+    now = time.time()
+    monkeypatch.setattr(posters.time, 'time', lambda: now + seconds)
+
+
+def test_thumbnail_created(server, cache):
+    base, _ = server
+    path = cache.get(f'{base}/red.png')
+    with Image.open(path) as image:
+        assert image.format == 'JPEG'
+        assert image.width <= cache.thumb_size[0] and image.height <= cache.thumb_size[1]
+
+
+def test_identical_posters_stored_once(server, cache):
+    base, _ = server
+    assert cache.get(f'{base}/red.png') == cache.get(f'{base}/red-copy.png')
+    cache.get(f'{base}/blue.png')
+    assert len(_blobs(cache)) == 2
+
+
+def test_second_pass_makes_no_requests(server, cache):
+    base, hits = server
+    urls = [f'{base}/{name}' for name in ('red.png', 'blue.png', 'missing', 'not-image')]
+    first = cache.get_many(urls)
+    before = dict(hits)
+    assert cache.get_many(urls) == first
+    assert hits == before
+    assert first[f'{base}/missing'] is None and first[f'{base}/red.png'] is not None
+
+
+@pytest.mark.parametrize('name', ['missing', 'not-image'])
+def test_dead_url_negative_entry_expires(server, cache, monkeypatch, name):
+    base, hits = server
+    url = f'{base}/{name}'
+    assert cache.get(url) is None
+    assert cache.lookup(url) is False
+    assert cache.get(url) is None
+    assert hits[f'/{name}'] == 1
+
+    # Masih tercatat mati setelah transient_ttl, baru kedaluwarsa setelah negative_ttl
+    _later(monkeypatch, cache.transient_ttl + 1)
+    assert cache.lookup(url) is False
+    _later(monkeypatch, cache.negative_ttl + 1)
+    assert cache.lookup(url) is None
+    cache.get(url)
+    assert hits[f'/{name}'] == 2
+
+
+def test_transient_failures_expire_quickly(server, cache, monkeypatch):
+    base, hits = server
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        closed = f'http://127.0.0.1:{s.getsockname()[1]}/red.png'
+
+    for url in (f'{base}/error', closed):
+        assert cache.get(url) is None
+        assert cache.lookup(url) is False
+    _later(monkeypatch, cache.transient_ttl + 1)
+    assert cache.lookup(f'{base}/error') is None
+    assert cache.lookup(closed) is None
+    cache.get(f'{base}/error')
+    assert hits['/error'] == 2
+
+
+def test_evict_keeps_most_recently_used(server, cache):
+    base, _ = server
+    blue = cache.get(f'{base}/blue.png')
+    green = cache.get(f'{base}/green.png')
+    old = time.time() - 100
+    os.utime(blue, (old, old))
+    os.utime(green, (old - 10, old - 10))
+
+    # blue dipakai lagi (mtime diperbarui), green paling lama tidak dipakai
+    assert cache.lookup(f'{base}/blue.png') == blue
+    cache.max_bytes = os.path.getsize(blue)
+    assert cache.evict() == 1
+    assert os.path.exists(blue) and not os.path.exists(green)
+    assert cache.lookup(f'{base}/green.png') is None
+
+
+# Evict (scan folder blob) hanya jalan kalau get_many menulis blob baru
+def test_get_many_evicts_only_after_new_blobs(server, cache, monkeypatch):
+    base, _ = server
+    calls = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, 'evict', lambda: calls.append(1) or evict())
+
+    urls = [f'{base}/red.png', f'{base}/blue.png', f'{base}/missing']
+    cache.get_many(urls)
+    assert len(calls) == 1
+    cache.get_many(urls)
+    cache.get_many([f'{base}/red-copy.png'])  # isi sama dengan red.png, tidak ada blob baru
+    assert len(calls) == 1
+    cache.get_many([f'{base}/green.png'])
+    assert len(calls) == 2
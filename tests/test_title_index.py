@@ -0,0 +1,84 @@
+import difflib
+import os
+import random
+
+import pytest
+
+from recommender.artifacts import ARTIFACT_DIR
+from recommender.text import normalize_string
+from recommender.title_index import TitleIndex
+
+DF_ALL = os.path.join(ARTIFACT_DIR, 'df_all.pkl')
+N_PER_EDIT = 150
+
+
+@pytest.fixture(scope='module')
+def index():
+    if not os.path.exists(DF_ALL):
+        pytest.skip('df_all.pkl tidak ada')
+    joblib = pytest.importorskip('joblib')
+    return TitleIndex(joblib.load(DF_ALL)['title'].tolist())
+
+
+# Typo satu huruf dari judul katalog: hapus, sisip, ganti, tukar
+def _misspellings(titles, n_per_edit=N_PER_EDIT, seed=0):
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    titles = [t for t in titles if len(t) >= 4]
+
+    def delete(t, i):
+        return t[:i] + t[i + 1:]
+
+    def insert(t, i):
+        return t[:i] + rng.choice(letters) + t[i:]
+
+    def substitute(t, i):
+        return t[:i] + rng.choice(letters) + t[i + 1:]
+
+    def transpose(t, i):
+        i = min(i, len(t) - 2)
+        return t[:i] + t[i + 1] + t[i] + t[i + 2:]
+
+    queries = []
+    for edit in (delete, insert, substitute, transpose):
+        for title in rng.sample(titles, n_per_edit):
+            queries.append(edit(title, rng.randrange(len(title))))
+    return queries
+
+
+# close_matches harus sama persis dengan difflib lama atas judul
+# ter-normalisasi tanpa duplikat (isi dan urutan)
+def test_close_matches_equal_difflib(index):
+    titles = list(dict.fromkeys(index.normalized))
+    assert titles == index.fuzzy_titles
+    mismatches = [
+        q for q in _misspellings(titles)
+        if index.close_matches(q, 5, 0.7) != difflib.get_close_matches(q, titles, 5, 0.7)
+    ]
+    assert not mismatches
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('The Dark Knight', 'The Dark Knight'),     # exact
+    ('  the DARK knight ', 'The Dark Knight'),  # exact setelah normalisasi
+    ('avata', 'Avatar'),                        # substring
+    ('knight rises', 'The Dark Knight Rises'),  # dua kata berurutan
+    ('Avtar', 'Avatar'),                        # typo (fuzzy)
+    ('inceptoin', 'Inception'),                 # typo (fuzzy)
+])
+def test_find_best_match_stages(index, query, expected):
+    idx = index.find_best_match(query)
+    assert idx is not None and index.titles[idx] == expected
+
+
+@pytest.mark.parametrize('query', [
+    'a',            # terlalu pendek
+    'dark rises',   # multi-kata tanpa partial match tidak sampai ke fuzzy
+])
+def test_find_best_match_none(index, query):
+    assert index.find_best_match(query) is None
+
+
+def test_exact_match_returns_first_row(index):
+    title = index.titles[0]
+    assert index.find_best_match(title) == index.normalized.index(normalize_string(title))